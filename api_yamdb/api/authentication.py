@@ -0,0 +1,125 @@
+"""
+Аутентификация приложения api.
+
+Access-токен, выданный get_jwt_token, содержит username, role, is_staff
+и is_superuser пользователя. По ним собирается экземпляр User без
+обращения к таблице пользователей: остальные поля отложены (deferred)
+и загрузятся из БД только при обращении к ним.
+
+Чтобы смена роли не ждала истечения токена, данные из токена
+периодически сверяются с БД: результат проверки хранится в памяти
+процесса JWT_CLAIMS_CACHE_TIMEOUT секунд и сбрасывается при сохранении
+пользователя (см. api.signals).
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.models import User
+
+from .metrics import observe_cache
+
+USER_CLAIMS = ('username', 'role', 'is_staff', 'is_superuser')
+
+_checked_claims = {}
+_checked_claims_lock = threading.Lock()
+
+
+def access_token_for_user(user):
+    """Выпускает access-токен с данными пользователя для прав доступа."""
+    token = AccessToken.for_user(user)
+    for claim in USER_CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
+
+def forget_user(user_id):
+    """Сбрасывает результат проверки данных токена для пользователя."""
+    with _checked_claims_lock:
+        _checked_claims.pop(user_id, None)
+
+
+def forget_all_users():
+    with _checked_claims_lock:
+        _checked_claims.clear()
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация без запроса к таблице пользователей.
+
+    Если в токене нет данных пользователя (токен выпущен не через
+    access_token_for_user) или они не совпадают с БД, пользователь
+    загружается из БД, как в JWTAuthentication.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+            claims = tuple(validated_token[claim] for claim in USER_CLAIMS)
+        except KeyError:
+            return super().get_user(validated_token)
+
+        fresh = self._claims_are_fresh(user_id, claims)
+        observe_cache('jwt_claims', fresh)
+        if fresh:
+            return self._build_user(user_id, claims)
+
+        user = super().get_user(validated_token)
+        actual = tuple(getattr(user, claim) for claim in USER_CLAIMS)
+        with _checked_claims_lock:
+            _checked_claims[user_id] = (time.monotonic(), actual)
+        return user
+
+    @staticmethod
+    def _claims_are_fresh(user_id, claims):
+        timeout = settings.JWT_CLAIMS_CACHE_TIMEOUT
+        if timeout is None:
+            return True
+        with _checked_claims_lock:
+            entry = _checked_claims.get(user_id)
+        if entry is None:
+            return False
+        checked_at, actual = entry
+        return actual == claims and time.monotonic() - checked_at < timeout
+
+    @staticmethod
+    def _build_user(user_id, claims):
+        data = dict(zip(USER_CLAIMS, claims), is_active=True)
+        data[api_settings.USER_ID_FIELD] = user_id
+        # from_db ожидает значения в порядке полей модели.
+        field_names = [
+            field.attname for field in User._meta.concrete_fields
+            if field.attname in data
+        ]
+        return User.from_db(
+            DEFAULT_DB_ALIAS,
+            field_names,
+            [data[name] for name in field_names],
+        )
+
+
+def is_admin_request(request):
+    """
+    Запрос от администратора по сессии или JWT-токену.
+
+    Для обычных представлений Django, которые не проходят аутентификацию
+    DRF.
+    """
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        try:
+            result = ClaimsJWTAuthentication().authenticate(request)
+        except AuthenticationFailed:
+            return False
+        if result is None:
+            return False
+        user = result[0]
+    return user.is_admin
@@ -0,0 +1,118 @@
+"""
+Кэширование вспомогательных данных приложения api.
+
+Версия модели - счетчик в кэше, который увеличивается при каждом
+изменении ее записей (см. api.signals). Версия входит в ключи кэша,
+поэтому после изменения данных старые записи просто перестают читаться.
+"""
+
+import threading
+import time
+from hashlib import md5
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db import connection
+
+from core.db import read_from_primary
+
+from .metrics import observe_cache
+
+
+def _version_key(model):
+    return f'model-version:{model._meta.label_lower}'
+
+
+def get_model_version(model):
+    """
+    Возвращает текущую версию модели.
+
+    Начальная версия берется из текущего времени, чтобы после
+    вытеснения счетчика из кэша ключи не совпали со старыми.
+    """
+    key = _version_key(model)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_model_version(model):
+    """Увеличивает версию модели после изменения ее записей."""
+    key = _version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+def _count_key(queryset):
+    sql, params = queryset.query.sql_with_params()
+    digest = md5(f'{sql}:{params}'.encode()).hexdigest()
+    version = get_model_version(queryset.model)
+    return f'count:{queryset.model._meta.label_lower}:{version}:{digest}'
+
+
+def _refresh_count(key, queryset):
+    """Пересчитывает количество записей в фоновом потоке."""
+    try:
+        cache.set(
+            key,
+            (queryset.count(), time.time()),
+            settings.PAGINATION_COUNT_TIMEOUT * 10,
+        )
+    finally:
+        cache.delete(f'{key}:refreshing')
+        connection.close()
+
+
+def cached_count(queryset):
+    """
+    Возвращает количество записей queryset из кэша.
+
+    Значение сбрасывается при изменении модели. Если значение старше
+    PAGINATION_COUNT_TIMEOUT секунд, возвращается оно же, а свежее
+    считается в фоновом потоке - поэтому число может быть приблизительным.
+    Количество, которое кладется в кэш, всегда считается по основной БД.
+    """
+    try:
+        key = _count_key(queryset)
+    except EmptyResultSet:
+        return 0
+    timeout = settings.PAGINATION_COUNT_TIMEOUT
+    entry = cache.get(key)
+    observe_cache('count', entry is not None)
+    if entry is None:
+        with read_from_primary():
+            count = queryset.count()
+        cache.set(key, (count, time.time()), timeout * 10)
+        return count
+
+    count, counted_at = entry
+    if (
+        time.time() - counted_at > timeout
+        and cache.add(f'{key}:refreshing', True, timeout)
+    ):
+        threading.Thread(
+            target=_refresh_count,
+            args=(key, queryset.all()),
+            daemon=True,
+        ).start()
+    return count
+
+
+def list_cache_key(model, query_params, base_url=''):
+    """
+    Ключ кэша ответа списка: модель, ее версия, параметры запроса и
+    base_url - схема и хост запроса, из которых DRF строит абсолютные
+    ссылки next и previous.
+
+    Параметры сортируются, чтобы ?a=1&b=2 и ?b=2&a=1 давали один ключ.
+    """
+    query = urlencode(sorted(query_params.lists()), doseq=True)
+    digest = md5(f'{base_url}?{query}'.encode()).hexdigest()
+    version = get_model_version(model)
+    return f'list:{model._meta.label_lower}:{version}:{digest}'
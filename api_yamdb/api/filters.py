@@ -4,15 +4,25 @@
 import django_filters
 
 from reviews.models import Title
+from reviews.search import search_titles
 
 
 class TitleFilter(django_filters.FilterSet):
-    """Фильтр для соритровки произведений."""
+    """
+    Фильтр для соритровки произведений.
+
+    search - полнотекстовый поиск по названию и описанию, результаты
+    сортируются по релевантности (см. reviews.search).
+    """
     category = django_filters.Filter(field_name='category__slug')
     genre = django_filters.Filter(field_name='genre__slug')
     name = django_filters.Filter(field_name='name', lookup_expr='contains')
     year = django_filters.NumberFilter(field_name='year')
+    search = django_filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = ('category', 'genre', 'year', 'name')
+        fields = ('category', 'genre', 'year', 'name', 'search')
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
@@ -0,0 +1,103 @@
+"""
+Сводный отчет по профилям запросов.
+"""
+
+import os
+import pstats
+from glob import glob
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from api.profiling import EXTENSIONS, read_collapsed, top_frames
+
+
+class Command(BaseCommand):
+    '''
+    Объединяет профили запросов из --dir (по умолчанию PROFILING_DIR) и
+    выводит --top самых затратных функций. Профили cProfile (.prof)
+    суммируются через pstats, профили сэмплера (.collapsed) - по числу
+    сэмплов; --collapsed-output сохраняет объединенные стеки для
+    flamegraph.pl. --view оставляет только профили представлений,
+    в имени которых есть эта строка.
+    '''
+    help = "Aggregates request profiles into a top-N report"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dir',
+            default=None,
+            help='Directory with profiles (default PROFILING_DIR)',
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=20,
+            help='Number of functions in the report (default 20)',
+        )
+        parser.add_argument(
+            '--sort',
+            choices=('cumulative', 'tottime'),
+            default='cumulative',
+            help='Sort by time including callees or own time only',
+        )
+        parser.add_argument(
+            '--view',
+            default='',
+            help='Only profiles of views containing this string',
+        )
+        parser.add_argument(
+            '--collapsed-output',
+            help='File for the merged stacks of .collapsed profiles',
+        )
+
+    def handle(self, *args, **options):
+        directory = options['dir'] or settings.PROFILING_DIR
+        if not directory or not os.path.isdir(directory):
+            raise CommandError(
+                'Profile directory not found, set --dir or PROFILING_DIR.'
+            )
+        if options['top'] < 1:
+            raise CommandError('--top must be at least 1.')
+        profiles = {
+            extension: sorted(
+                path for path in glob(os.path.join(directory, f'*{extension}'))
+                if options['view'] in os.path.basename(path)
+            )
+            for extension in EXTENSIONS.values()
+        }
+        if not any(profiles.values()):
+            raise CommandError(f'No profiles found in {directory}.')
+
+        if profiles['.prof']:
+            self.report_cprofile(profiles['.prof'], options)
+        if profiles['.collapsed']:
+            self.report_collapsed(profiles['.collapsed'], options)
+
+    def report_cprofile(self, paths, options):
+        output = StringIO()
+        stats = pstats.Stats(*paths, stream=output)
+        stats.sort_stats(options['sort']).print_stats(options['top'])
+        self.stdout.write(f'cProfile: {len(paths)} profiles')
+        self.stdout.write(output.getvalue())
+
+    def report_collapsed(self, paths, options):
+        stacks = read_collapsed(paths)
+        samples = sum(stacks.values())
+        self.stdout.write(
+            f'Sampler: {len(paths)} profiles, {samples} samples'
+        )
+        self.stdout.write(f'{"own":>8}{"total":>8}  function')
+        for label, own, total in top_frames(
+            stacks, options['top'], options['sort']
+        ):
+            self.stdout.write(f'{own:>8}{total:>8}  {label}')
+        if options['collapsed_output']:
+            with open(options['collapsed_output'], 'w',
+                      encoding='utf-8') as collapsed_file:
+                for stack, count in stacks.most_common():
+                    collapsed_file.write(f'{stack} {count}\n')
+            self.stdout.write(
+                f'Merged stacks saved to {options["collapsed_output"]}'
+            )
@@ -0,0 +1,394 @@
+"""
+Метрики приложения в текстовом формате Prometheus.
+
+Счетчики (Counter) и гистограммы с фиксированными корзинами (Histogram)
+пишут значения в хранилище процесса. Без настройки METRICS_DIR это
+словари в памяти: у каждого потока свой словарь, поэтому запись идет
+без блокировок, а при выдаче метрик словари суммируются.
+
+С METRICS_DIR каждый процесс пишет значения в свой файл
+metrics-<pid>.db через mmap, а /metrics суммирует файлы всех процессов,
+так что при нескольких воркерах ответ не зависит от того, какой воркер
+его отдал. Файлы остановленных процессов тоже учитываются, поэтому
+каталог нужно очищать при перезапуске сервиса.
+"""
+
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from glob import glob
+
+from django.conf import settings
+
+# Секунды для гистограмм времени и количество SQL-запросов на запрос.
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class MemoryStore:
+    """
+    Значения метрик в памяти процесса.
+
+    Каждый поток увеличивает значения в своем словаре. Словари
+    завершившихся потоков складываются в общий, чтобы их число не росло
+    вместе с числом потоков, обслуживших запросы.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards = []
+        self._retired = {}
+
+    def _shard(self):
+        values = getattr(self._local, 'values', None)
+        if values is None:
+            values = self._local.values = {}
+            with self._lock:
+                self._retire_dead()
+                self._shards.append((threading.current_thread(), values))
+        return values
+
+    def _retire_dead(self):
+        alive = []
+        for thread, values in self._shards:
+            if thread.is_alive():
+                alive.append((thread, values))
+            else:
+                _add_values(self._retired, values.items())
+        self._shards = alive
+
+    def inc(self, key, amount):
+        values = self._shard()
+        values[key] = values.get(key, 0) + amount
+
+    def collect(self):
+        with self._lock:
+            self._retire_dead()
+            totals = dict(self._retired)
+            for _, values in self._shards:
+                _add_values(totals, list(values.items()))
+        return totals
+
+
+_USED = struct.Struct('<Q')
+_LENGTH = struct.Struct('<I')
+_VALUE = struct.Struct('<d')
+
+
+def _align(position):
+    return (position + 7) // 8 * 8
+
+
+def _entries(data, used):
+    """
+    Записи файла метрик: (ключ, значение, смещение значения).
+
+    Файл начинается с размера занятой части, за ним идут записи: длина
+    ключа, ключ в utf-8 и значение double, выровненное по 8 байтам.
+    """
+    position = _USED.size
+    while position < used:
+        length = _LENGTH.unpack_from(data, position)[0]
+        key_start = position + _LENGTH.size
+        key = bytes(data[key_start:key_start + length]).decode()
+        value_position = _align(key_start + length)
+        yield key, _VALUE.unpack_from(data, value_position)[0], value_position
+        position = value_position + _VALUE.size
+
+
+class MmapValues:
+    """
+    Файл значений одного процесса, отображенный в память.
+
+    Новый ключ дописывается в конец, и только затем обновляется размер
+    занятой части, поэтому другие процессы читают файл без блокировок.
+    """
+
+    INITIAL_SIZE = 64 * 1024
+
+    def __init__(self, path):
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        self._capacity = os.fstat(self._fd).st_size
+        if self._capacity < self.INITIAL_SIZE:
+            self._capacity = self.INITIAL_SIZE
+            os.ftruncate(self._fd, self._capacity)
+        self._map = mmap.mmap(self._fd, self._capacity)
+        self._used = _USED.unpack_from(self._map, 0)[0] or _USED.size
+        self._positions = {
+            key: position
+            for key, _, position in _entries(self._map, self._used)
+        }
+
+    def inc(self, key, amount):
+        position = self._positions.get(key)
+        if position is None:
+            position = self._append(key)
+        value = _VALUE.unpack_from(self._map, position)[0]
+        _VALUE.pack_into(self._map, position, value + amount)
+
+    def _append(self, key):
+        encoded = key.encode()
+        key_start = self._used + _LENGTH.size
+        value_position = _align(key_start + len(encoded))
+        end = value_position + _VALUE.size
+        if end > self._capacity:
+            self._grow(end)
+        _LENGTH.pack_into(self._map, self._used, len(encoded))
+        self._map[key_start:key_start + len(encoded)] = encoded
+        _VALUE.pack_into(self._map, value_position, 0.0)
+        self._used = end
+        _USED.pack_into(self._map, 0, end)
+        self._positions[key] = value_position
+        return value_position
+
+    def _grow(self, end):
+        while self._capacity < end:
+            self._capacity *= 2
+        self._map.close()
+        os.ftruncate(self._fd, self._capacity)
+        self._map = mmap.mmap(self._fd, self._capacity)
+
+
+def read_values(path):
+    """Значения из файла метрик любого процесса: {ключ: значение}."""
+    with open(path, 'rb') as values_file:
+        data = values_file.read()
+    if len(data) < _USED.size:
+        return {}
+    used = min(_USED.unpack_from(data, 0)[0], len(data))
+    return {key: value for key, value, _ in _entries(data, used)}
+
+
+class FileStore:
+    """
+    Значения метрик в файлах каталога directory, по файлу на процесс.
+
+    Файл открывается при первой записи и заново после fork, так что
+    воркеры, запущенные из одного мастер-процесса, пишут в разные файлы.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._values = None
+        self._pid = None
+
+    def inc(self, key, amount):
+        key = json.dumps(key)
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._values = MmapValues(
+                    os.path.join(self.directory, f'metrics-{self._pid}.db')
+                )
+            self._values.inc(key, amount)
+
+    def collect(self):
+        totals = {}
+        for path in glob(os.path.join(self.directory, 'metrics-*.db')):
+            for key, value in read_values(path).items():
+                name, labels = json.loads(key)
+                key = (name, tuple(map(tuple, labels)))
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+
+def _add_values(totals, items):
+    for key, value in items:
+        totals[key] = totals.get(key, 0) + value
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store():
+    """Хранилище для текущего METRICS_DIR или None, если метрики выключены."""
+    if not settings.METRICS:
+        return None
+    directory = settings.METRICS_DIR
+    store = _stores.get(directory)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(directory)
+            if store is None:
+                store = FileStore(directory) if directory else MemoryStore()
+                _stores[directory] = store
+    return store
+
+
+def format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value):
+    return (
+        value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+    )
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(
+        f'{name}="{_escape(value)}"' for name, value in labels
+    ) + '}'
+
+
+REGISTRY = []
+
+
+class Metric:
+    """Метрика с именем, описанием и именами меток."""
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        REGISTRY.append(self)
+
+    def _labels(self, labels):
+        return tuple((name, str(labels[name])) for name in self.labelnames)
+
+    def header(self):
+        return (
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.type}',
+        )
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        store = get_store()
+        if store is not None:
+            store.inc((self.name, self._labels(labels)), amount)
+
+    def expose(self, samples):
+        yield from self.header()
+        for labels, value in sorted(samples.get(self.name, {}).items()):
+            yield f'{self.name}{format_labels(labels)} {format_value(value)}'
+
+
+class Histogram(Metric):
+    """
+    Гистограмма с фиксированными верхними границами корзин.
+
+    В хранилище пишется количество значений в каждой корзине и их
+    сумма; накопленные счетчики _bucket и _count считаются при выдаче.
+    """
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=()):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(bound) for bound in buckets))
+        self.buckets += (math.inf,)
+        self.bounds = tuple(format_value(bound) for bound in self.buckets)
+
+    def observe(self, value, **labels):
+        store = get_store()
+        if store is None:
+            return
+        labels = self._labels(labels)
+        bound = self.bounds[bisect_left(self.buckets, value)]
+        store.inc((f'{self.name}_bucket', labels + (('le', bound),)), 1)
+        store.inc((f'{self.name}_sum', labels), value)
+
+    def expose(self, samples):
+        yield from self.header()
+        indexes = {bound: index for index, bound in enumerate(self.bounds)}
+        counts = defaultdict(lambda: [0] * len(self.bounds))
+        for labels, value in samples.get(f'{self.name}_bucket', {}).items():
+            index = indexes.get(labels[-1][1])
+            if index is not None:
+                counts[labels[:-1]][index] += value
+        sums = samples.get(f'{self.name}_sum', {})
+        for labels in sorted(counts):
+            total = 0
+            for bound, count in zip(self.bounds, counts[labels]):
+                total += count
+                yield (
+                    f'{self.name}_bucket'
+                    f'{format_labels(labels + (("le", bound),))} '
+                    f'{format_value(total)}'
+                )
+            yield (
+                f'{self.name}_sum{format_labels(labels)} '
+                f'{format_value(sums.get(labels, 0))}'
+            )
+            yield (
+                f'{self.name}_count{format_labels(labels)} '
+                f'{format_value(total)}'
+            )
+
+
+REQUESTS = Counter(
+    'yamdb_http_requests_total',
+    'HTTP requests by view, method and response status.',
+    ('view', 'method', 'status'),
+)
+REQUEST_DURATION = Histogram(
+    'yamdb_http_request_duration_seconds',
+    'Time to process an HTTP request, including response rendering.',
+    ('view', 'method'),
+    LATENCY_BUCKETS,
+)
+REQUEST_DB_QUERIES = Histogram(
+    'yamdb_http_request_db_queries',
+    'SQL queries executed per HTTP request.',
+    ('view', 'method'),
+    QUERY_BUCKETS,
+)
+REQUEST_DB_DURATION = Histogram(
+    'yamdb_http_request_db_duration_seconds',
+    'Time spent in SQL queries per HTTP request.',
+    ('view', 'method'),
+    LATENCY_BUCKETS,
+)
+CACHE_REQUESTS = Counter(
+    'yamdb_cache_requests_total',
+    'Application cache lookups by cache and result (hit or miss).',
+    ('cache', 'result'),
+)
+
+
+def observe_request(timing, method, status):
+    """Записывает замеры запроса (см. api.middleware.RequestTiming)."""
+    view = timing.view or 'unresolved'
+    REQUESTS.inc(view=view, method=method, status=status)
+    REQUEST_DURATION.observe(timing.total_time, view=view, method=method)
+    REQUEST_DB_QUERIES.observe(timing.queries, view=view, method=method)
+    REQUEST_DB_DURATION.observe(timing.db_time, view=view, method=method)
+
+
+def observe_cache(cache_name, hit):
+    CACHE_REQUESTS.inc(cache=cache_name, result='hit' if hit else 'miss')
+
+
+def render_metrics():
+    """Все метрики REGISTRY в текстовом формате Prometheus."""
+    store = get_store()
+    samples = defaultdict(dict)
+    if store is not None:
+        for (name, labels), value in store.collect().items():
+            samples[name][labels] = value
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.expose(samples))
+    return '\n'.join(lines) + '\n'
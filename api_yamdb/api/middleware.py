@@ -0,0 +1,232 @@
+"""
+Middleware приложения api.
+
+RequestTimingMiddleware замеряет для каждого запроса количество и
+время SQL-запросов, время рендеринга ответа в JSON, время остального
+кода (представление, сериализаторы, middleware) и общее время; три
+первые фазы не пересекаются и в сумме дают общее время. Результат
+отдается в заголовке Server-Timing и пишется в лог api.timing строкой
+key=value; поля доступны и через extra записи лога. Заголовок и лог
+включаются настройкой REQUEST_TIMING независимо от DEBUG, замеры для
+/metrics - настройкой METRICS (см. api.metrics).
+
+NPlusOneMiddleware ищет в запросе N+1 запросы к БД (см. api.nplusone).
+
+ProfilingMiddleware профилирует выбранные запросы (см. api.profiling).
+"""
+
+import logging
+import os
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .metrics import observe_request
+from .nplusone import NPlusOneError, QueryTracker
+from .profiling import create_profiler, profile_path, should_profile
+
+logger = logging.getLogger('api.timing')
+nplusone_logger = logging.getLogger('api.nplusone')
+
+
+def view_name(view_func, method):
+    """
+    Имя представления для метрик: ViewSet.action для вьюсетов DRF,
+    имя функции для @api_view и остальных представлений.
+    """
+    cls = getattr(view_func, 'cls', None)
+    actions = getattr(view_func, 'actions', None)
+    if cls is not None and actions:
+        action = actions.get(method.lower(), method.lower())
+        return f'{cls.__name__}.{action}'
+    return getattr(view_func, '__name__', type(view_func).__name__)
+
+
+class RequestTiming:
+    """Замеры одного запроса."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view = None
+        self.queries = 0
+        self.db_time = 0.0
+        self.render_started = None
+        self.render_db_time = 0.0
+        self.render_time = 0.0
+        self.total_time = 0.0
+
+    def track_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+
+    def start_render(self):
+        self.render_started = time.perf_counter()
+        self.render_db_time = self.db_time
+
+    def finish_render(self, response):
+        if self.render_started is not None:
+            # SQL-запросы при рендеринге уже учтены в db_time.
+            self.render_time += (
+                time.perf_counter() - self.render_started
+                - (self.db_time - self.render_db_time)
+            )
+            self.render_started = None
+
+    def finish(self):
+        self.total_time = time.perf_counter() - self.started
+
+    @property
+    def app_time(self):
+        """Время вне SQL-запросов и рендеринга, в том числе сериализация."""
+        return max(self.total_time - self.db_time - self.render_time, 0.0)
+
+    def server_timing(self):
+        return ', '.join((
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.queries} queries"',
+            f'app;dur={self.app_time * 1000:.2f}',
+            f'render;dur={self.render_time * 1000:.2f}',
+            f'total;dur={self.total_time * 1000:.2f}',
+        ))
+
+    def as_dict(self):
+        return {
+            'view': self.view,
+            'queries': self.queries,
+            'db_ms': round(self.db_time * 1000, 2),
+            'app_ms': round(self.app_time * 1000, 2),
+            'render_ms': round(self.render_time * 1000, 2),
+            'total_ms': round(self.total_time * 1000, 2),
+        }
+
+
+class RequestTimingMiddleware:
+    """
+    Middleware для замера времени обработки запроса.
+
+    Запросы ко всем базам из DATABASES считаются через execute_wrapper.
+    render - рендеринг ответа DRF, который Django выполняет после
+    process_template_response. Сериализация данных (serializer.data)
+    выполняется в представлении и входит в app.
+    """
+
+    def __init__(self, get_response):
+        if not (
+            getattr(settings, 'REQUEST_TIMING', False)
+            or getattr(settings, 'METRICS', False)
+        ):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timing = request.timing = RequestTiming()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(
+                    connections[alias].execute_wrapper(timing.track_query)
+                )
+            response = self.get_response(request)
+        timing.finish()
+
+        observe_request(timing, request.method, response.status_code)
+        if not settings.REQUEST_TIMING:
+            return response
+        response['Server-Timing'] = timing.server_timing()
+        fields = timing.as_dict()
+        fields.update(
+            method=request.method,
+            path=request.path,
+            status=response.status_code,
+        )
+        logger.info(
+            ' '.join(f'{key}={value}' for key, value in fields.items()),
+            extra={'timing': fields},
+        )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.timing.view = view_name(view_func, request.method)
+
+    def process_template_response(self, request, response):
+        request.timing.start_render()
+        response.add_post_render_callback(request.timing.finish_render)
+        return response
+
+
+class NPlusOneMiddleware:
+    """
+    Middleware для поиска N+1 запросов.
+
+    При NPLUSONE = 'warn' найденные запросы пишутся предупреждением в
+    лог api.nplusone, при 'raise' - выбрасывается NPlusOneError (так
+    настроены тесты, см. фикстуру nplusone).
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'NPLUSONE', None):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = settings.NPLUSONE
+        if not mode:
+            return self.get_response(request)
+        tracker = request.nplusone = QueryTracker(
+            settings.NPLUSONE_THRESHOLD
+        )
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(
+                    connections[alias].execute_wrapper(tracker)
+                )
+            response = self.get_response(request)
+
+        report = tracker.report()
+        if report:
+            if mode == 'raise':
+                raise NPlusOneError(report)
+            nplusone_logger.warning(report)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if hasattr(request, 'nplusone'):
+            request.nplusone.view = view_name(view_func, request.method)
+
+
+class ProfilingMiddleware:
+    """
+    Middleware для профилирования запроса.
+
+    Стоит последним, чтобы пользователь сессии уже был известен, и
+    профилирует представление вместе с рендерингом ответа.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILING_DIR', None):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not should_profile(request):
+            return self.get_response(request)
+        request.profile_view = 'unresolved'
+        profiler = create_profiler()
+        profiler.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        path = profile_path(request.profile_view)
+        profiler.dump_stats(path)
+        response['X-Profile'] = os.path.basename(path)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if hasattr(request, 'profile_view'):
+            request.profile_view = view_name(view_func, request.method)
@@ -2,9 +2,34 @@
 Миксины и кастомные вьюсеты приложения api.
 """
 
+import logging
+from contextlib import ExitStack
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
 from rest_framework import mixins, status, viewsets
+from rest_framework.permissions import SAFE_METHODS
 from rest_framework.response import Response
 
+from core.db import (
+    is_pinned_to_primary,
+    pin_to_primary,
+    read_from_primary,
+    read_from_replica
+)
+
+from .cache import get_model_version, list_cache_key
+from .metrics import observe_cache
+from .pagination import PubDateCursorPagination
+
+logger = logging.getLogger(__name__)
+
 
 class PartialUpdateModelMixin:
     """Миксин для частичного обновления модели."""
@@ -21,6 +46,218 @@ class PartialUpdateModelMixin:
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class CursorPaginationMixin:
+    """
+    Миксин для включения курсорной пагинации.
+
+    Курсорная пагинация используется, если в запросе передан параметр
+    pagination=cursor или cursor, либо если в настройках включено
+    CURSOR_PAGINATION. Иначе используется пагинация по умолчанию.
+    """
+    cursor_pagination_class = PubDateCursorPagination
+
+    def use_cursor_pagination(self):
+        query_params = self.request.query_params
+        return (
+            getattr(settings, 'CURSOR_PAGINATION', False)
+            or query_params.get('pagination') == 'cursor'
+            or 'cursor' in query_params
+        )
+
+    @property
+    def paginator(self):
+        if (
+            not hasattr(self, '_paginator')
+            and self.request is not None
+            and self.use_cursor_pagination()
+        ):
+            self._paginator = self.cursor_pagination_class()
+        return super().paginator
+
+
+class QueryBudgetMixin:
+    """
+    Миксин для контроля количества SQL-запросов.
+
+    В режиме DEBUG считает запросы ко всем БД за время обработки запроса и
+    пишет предупреждение в лог, если их больше query_budget. Бюджет
+    задается числом или словарем {action: число}.
+    """
+    query_budget = None
+
+    def get_query_budget(self):
+        if isinstance(self.query_budget, dict):
+            return self.query_budget.get(getattr(self, 'action', None))
+        return self.query_budget
+
+    def dispatch(self, request, *args, **kwargs):
+        if not settings.DEBUG or self.query_budget is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        queries = []
+
+        def count_query(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        # Чтение может идти с реплик (см. ReplicaReadMixin), поэтому
+        # запросы считаются по всем базам.
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(
+                    connections[alias].execute_wrapper(count_query)
+                )
+            response = super().dispatch(request, *args, **kwargs)
+        budget = self.get_query_budget()
+        if budget is not None and len(queries) > budget:
+            logger.warning(
+                '%s.%s ran %d queries, budget is %d: %s %s',
+                type(self).__name__,
+                getattr(self, 'action', None),
+                len(queries),
+                budget,
+                request.method,
+                request.get_full_path(),
+            )
+        return response
+
+
+class ReplicaReadMixin:
+    """
+    Миксин для чтения с реплик (см. core.db).
+
+    Безопасные запросы читают данные с реплики, если клиент недавно
+    ничего не записывал. Успешный небезопасный запрос закрепляет
+    клиента за основной БД на REPLICA_PIN_SECONDS (подписанная cookie).
+    Аутентификация выполняется до выбора БД и читает из default.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        with ExitStack() as self.database_context:
+            return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (
+            settings.READ_REPLICAS
+            and request.method in SAFE_METHODS
+            and not is_pinned_to_primary(request)
+        ):
+            self.database_context.enter_context(read_from_replica())
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+        ):
+            pin_to_primary(response)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class CachedListMixin:
+    """
+    Миксин для кэширования ответа на GET-запрос списка.
+
+    Данные ответа хранятся в кэше Django по ключу из параметров запроса,
+    схемы и хоста (из них строятся абсолютные ссылки пагинации) и версии
+    модели. Версия увеличивается при создании, изменении и удалении
+    записей (см. api.signals), так что между изменениями список
+    отдается без обращения к БД. Промах кэша читается из
+    основной БД: данные реплики могут быть старше версии в ключе.
+    """
+
+    def list(self, request, *args, **kwargs):
+        key = list_cache_key(
+            self.queryset.model,
+            request.query_params,
+            request.build_absolute_uri('/'),
+        )
+        data = cache.get(key)
+        observe_cache('list', data is not None)
+        if data is None:
+            with read_from_primary():
+                data = super().list(request, *args, **kwargs).data
+            cache.set(key, data, settings.LIST_CACHE_TIMEOUT)
+        return Response(data)
+
+
+class ConditionalGetMixin:
+    """
+    Миксин для условных GET-запросов с ETag.
+
+    ETag считается одним агрегирующим запросом по выборке (количество
+    строк и максимальное значение поля modified) без сериализации
+    ответа. Если клиент прислал совпадающий If-None-Match, возвращается
+    ответ 304. Агрегат подходит для одной записи и списков, ограниченных
+    родительским объектом (отзывы произведения, комментарии отзыва).
+
+    Для списков по всей таблице агрегат стоил бы как полный проход по
+    ней, поэтому при заданном list_etag_models ETag списка считается без
+    запросов к БД: из полного пути запроса и версий этих моделей (см.
+    api.cache). Версии увеличиваются сигналами, так что изменения в
+    обход сигналов (update(), bulk_create) такой ETag не замечает.
+
+    Last-Modified не отдается: удаление старой записи или изменение
+    связанных данных (рейтинг, автор) не меняет max(modified), и ответы
+    на If-Modified-Since были бы устаревшими.
+
+    etag_aggregates - дополнительные агрегаты, входящие в ETag;
+    etag_models - модели, версии которых (см. api.cache) входят в ETag,
+    например модели вложенных в ответ объектов; list_etag_models -
+    модели, по версиям которых считается ETag списка вместо агрегата.
+    """
+    etag_aggregates = {}
+    etag_models = ()
+    list_etag_models = None
+
+    def get_conditional_queryset(self):
+        queryset = self.get_queryset()
+        if self.action == 'retrieve':
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            return queryset.filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+        return self.filter_queryset(queryset)
+
+    def get_etag(self, request):
+        """Возвращает ETag выборки."""
+        if self.action == 'list' and self.list_etag_models is not None:
+            versions = [
+                get_model_version(model) for model in self.list_etag_models
+            ]
+            source = f'{request.get_full_path()}:{versions}'
+            return quote_etag(md5(source.encode()).hexdigest())
+        state = self.get_conditional_queryset().order_by().aggregate(
+            last_modified=Max('modified'),
+            count=Count('pk', distinct=True),
+            **self.etag_aggregates,
+        )
+        versions = [get_model_version(model) for model in self.etag_models]
+        source = (
+            f'{request.get_full_path()}:{sorted(state.items())}:{versions}'
+        )
+        return quote_etag(md5(source.encode()).hexdigest())
+
+    def conditional_get(self, request, method, *args, **kwargs):
+        etag = self.get_etag(request)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = method(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_get(
+            request, super().list, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_get(
+            request, super().retrieve, *args, **kwargs
+        )
+
+
 class ListCreateDestroyViewSet(
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
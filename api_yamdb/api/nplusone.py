@@ -0,0 +1,120 @@
+"""
+Поиск N+1 запросов.
+
+QueryTracker считает SELECT-запросы одного HTTP-запроса по структуре:
+значения параметров, числа и строки в SQL и длина списков IN (...) не
+учитываются. Если одинаковый по структуре запрос выполнен
+NPLUSONE_THRESHOLD раз, запоминается, из какого поля сериализатора и
+из какого места кода проекта он пришел - обычно это ленивая загрузка
+связанного объекта для каждой записи списка.
+
+Что делать с найденными запросами, решает настройка NPLUSONE (см.
+api.middleware.NPlusOneMiddleware): 'warn' - предупреждение в лог
+api.nplusone, 'raise' - исключение NPlusOneError, None - не искать.
+"""
+
+import os
+import re
+import sys
+from collections import Counter
+
+from django.conf import settings
+from rest_framework.serializers import Field, ListSerializer
+
+_IN_LIST = re.compile(r'\bIN \((?:%s, )*%s\)')
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+
+# Методы полей DRF, которые читают значение из объекта.
+FIELD_METHODS = ('get_attribute', 'to_representation')
+
+# Файлы оберток execute_wrapper: вызовы из них не место запроса.
+_SKIP_FILES = tuple(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+    for filename in ('middleware.py', 'nplusone.py')
+)
+
+
+class NPlusOneError(Exception):
+    """Найдены N+1 запросы при NPLUSONE = 'raise'."""
+
+
+def fingerprint(sql):
+    """SQL без значений: одинаковый для запросов одной структуры."""
+    return _LITERAL.sub('?', _IN_LIST.sub('IN (...)', sql))
+
+
+def field_path(field):
+    """Имя поля вида TitleSerializer.genre."""
+    parent = field.parent
+    if isinstance(parent, ListSerializer):
+        field, parent = parent, parent.parent
+    if parent is None:
+        return type(field).__name__
+    return f'{type(parent).__name__}.{field.field_name}'
+
+
+def serializer_field(frame):
+    """Поле сериализатора, при чтении которого выполняется запрос."""
+    while frame is not None:
+        field = frame.f_locals.get('self')
+        if (
+            frame.f_code.co_name in FIELD_METHODS
+            and isinstance(field, Field)
+            and field.field_name
+        ):
+            return field_path(field)
+        frame = frame.f_back
+    return None
+
+
+def project_location(frame):
+    """Ближайший к запросу вызов из кода проекта: файл:строка в функции."""
+    base_dir = str(settings.BASE_DIR)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename.startswith(base_dir) and filename not in _SKIP_FILES:
+            return (
+                f'{os.path.relpath(filename, base_dir)}:{frame.f_lineno} '
+                f'in {frame.f_code.co_name}'
+            )
+        frame = frame.f_back
+    return None
+
+
+class QueryTracker:
+    """
+    Обертка execute_wrapper, которая ищет повторяющиеся запросы.
+
+    Место запроса определяется только когда счетчик доходит до
+    threshold, так что обход стека не замедляет остальные запросы.
+    """
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.view = None
+        self.counts = Counter()
+        self.sources = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.lstrip()[:6].upper() == 'SELECT':
+            key = fingerprint(sql)
+            self.counts[key] += 1
+            if self.counts[key] == self.threshold:
+                frame = sys._getframe(1)
+                self.sources[key] = (
+                    serializer_field(frame), project_location(frame)
+                )
+        return execute(sql, params, many, context)
+
+    def report(self):
+        """Описание найденных N+1 запросов или пустая строка."""
+        lines = []
+        for key, (field, location) in self.sources.items():
+            lines.append(f'{self.counts[key]} x {key}')
+            if field is not None:
+                lines.append(f'    field: {field}')
+            if location is not None:
+                lines.append(f'    at: {location}')
+        if not lines:
+            return ''
+        return f'N+1 queries in {self.view}:\n' + '\n'.join(lines)
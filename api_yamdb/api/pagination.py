@@ -0,0 +1,112 @@
+"""
+Пагинаторы приложения api.
+"""
+
+from collections import OrderedDict
+
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    CursorPagination,
+    PageNumberPagination,
+)
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .cache import cached_count
+
+
+class PubDateCursorPagination(CursorPagination):
+    """
+    Курсорная пагинация по (-pub_date, id).
+
+    Страница выбирается по значению pub_date из курсора, а не через
+    OFFSET, и не требует COUNT(*), поэтому стоимость любой страницы
+    одинакова. Опирается на индексы (title, pub_date) и
+    (review, pub_date).
+    """
+    ordering = ('-pub_date', 'id')
+
+
+class CachedCountPaginator(Paginator):
+    """Паджинатор Django, берущий количество записей из кэша."""
+
+    @cached_property
+    def count(self):
+        return cached_count(self.object_list)
+
+
+class CachedCountPagination(PageNumberPagination):
+    """
+    Пагинация по номеру страницы с кэшированным count.
+
+    Формат ответа тот же, что у PageNumberPagination, но COUNT(*)
+    выполняется только после изменения модели или в фоне, когда
+    значение устарело (см. api.cache.cached_count).
+    """
+    django_paginator_class = CachedCountPaginator
+
+
+class CountlessPagination(PageNumberPagination):
+    """
+    Пагинация по номеру страницы без count.
+
+    Вместо COUNT(*) выбирается на одну запись больше размера страницы,
+    чтобы понять, есть ли следующая. Ответ содержит только next,
+    previous и results.
+    """
+    display_page_controls = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        try:
+            self.page_number = int(
+                request.query_params.get(self.page_query_param, 1)
+            )
+            if self.page_number < 1:
+                raise ValueError
+        except ValueError:
+            raise NotFound(self.invalid_page_message)
+
+        offset = (self.page_number - 1) * page_size
+        objects = list(queryset[offset:offset + page_size + 1])
+        if not objects and self.page_number > 1:
+            raise NotFound(self.invalid_page_message)
+
+        self.has_next = len(objects) > page_size
+        self.request = request
+        return objects[:page_size]
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        del response_schema['properties']['count']
+        return response_schema
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.page_query_param, self.page_number + 1
+        )
+
+    def get_previous_link(self):
+        if self.page_number == 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(
+            url, self.page_query_param, self.page_number - 1
+        )
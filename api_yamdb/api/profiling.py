@@ -0,0 +1,154 @@
+"""
+Профилирование отдельных запросов.
+
+Запрос профилируется, если задан каталог PROFILING_DIR и либо
+администратор прислал заголовок X-Profile, либо запрос попал в
+случайную выборку с долей PROFILING_SAMPLE_RATE. Профиль пишется в
+отдельный файл, имя которого возвращается в заголовке X-Profile ответа.
+
+PROFILING_MODE выбирает способ: 'cprofile' - детерминированный профиль
+cProfile в файл .prof для pstats, 'sample' - сэмплер стека, который
+каждые PROFILING_INTERVAL секунд запоминает стек потока запроса и пишет
+файл .collapsed в формате flamegraph.pl. Сэмплер почти не замедляет
+запрос, но пропускает короткие вызовы. Файлы объединяет в один отчет
+команда profile_report.
+"""
+
+import cProfile
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from functools import lru_cache
+
+from django.conf import settings
+
+from .authentication import is_admin_request
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+
+EXTENSIONS = {'cprofile': '.prof', 'sample': '.collapsed'}
+
+
+def should_profile(request):
+    if not settings.PROFILING_DIR:
+        return False
+    if request.META.get(PROFILE_HEADER) and is_admin_request(request):
+        return True
+    rate = settings.PROFILING_SAMPLE_RATE
+    return rate > 0 and random.random() < rate
+
+
+@lru_cache(maxsize=None)
+def _short_path(filename):
+    """Путь файла относительно проекта или ближайшего каталога sys.path."""
+    roots = [str(settings.BASE_DIR)] + sorted(
+        (path for path in sys.path if path), key=len, reverse=True
+    )
+    for root in roots:
+        if filename.startswith(root + os.sep):
+            return os.path.relpath(filename, root)
+    return filename
+
+
+def frame_label(frame):
+    code = frame.f_code
+    return f'{_short_path(code.co_filename)}:{code.co_name}'.replace(';', ',')
+
+
+def collapse(frame):
+    """Стек от корня к frame в формате flamegraph: a;b;c."""
+    labels = []
+    while frame is not None:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+
+class StackSampler:
+    """
+    Сэмплер стека одного потока.
+
+    Фоновый поток каждые interval секунд берет текущий кадр
+    профилируемого потока из sys._current_frames и считает стеки.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.stacks = Counter()
+        self._thread_id = None
+        self._stopped = threading.Event()
+        self._sampler = None
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is not None:
+                self.stacks[collapse(frame)] += 1
+
+    def enable(self):
+        self._thread_id = threading.get_ident()
+        self._sampler = threading.Thread(target=self._run, daemon=True)
+        self._sampler.start()
+
+    def disable(self):
+        self._stopped.set()
+        self._sampler.join()
+
+    def dump_stats(self, path):
+        with open(path, 'w', encoding='utf-8') as collapsed_file:
+            for stack, count in self.stacks.most_common():
+                collapsed_file.write(f'{stack} {count}\n')
+
+
+def create_profiler():
+    if settings.PROFILING_MODE == 'sample':
+        return StackSampler(settings.PROFILING_INTERVAL)
+    return cProfile.Profile()
+
+
+def profile_path(view):
+    """Уникальный путь файла профиля в PROFILING_DIR."""
+    os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+    extension = EXTENSIONS.get(settings.PROFILING_MODE, '.prof')
+    return os.path.join(
+        settings.PROFILING_DIR,
+        f'{time.strftime("%Y%m%d-%H%M%S")}-{view}-{uuid.uuid4().hex[:8]}'
+        f'{extension}',
+    )
+
+
+def read_collapsed(paths):
+    """Суммирует стеки из файлов .collapsed: {стек: число сэмплов}."""
+    stacks = Counter()
+    for path in paths:
+        with open(path, encoding='utf-8') as collapsed_file:
+            for line in collapsed_file:
+                stack, _, count = line.rstrip('\n').rpartition(' ')
+                if stack and count.isdigit():
+                    stacks[stack] += int(count)
+    return stacks
+
+
+def top_frames(stacks, top, sort='cumulative'):
+    """
+    Функции с наибольшим числом сэмплов: (функция, свои, всего).
+
+    Свои сэмплы - функция на вершине стека, всего - функция где-либо в
+    стеке (рекурсивные вызовы считаются один раз). sort='tottime'
+    сортирует по своим сэмплам, 'cumulative' - по всем.
+    """
+    own, total = Counter(), Counter()
+    for stack, count in stacks.items():
+        labels = stack.split(';')
+        own[labels[-1]] += count
+        for label in set(labels):
+            total[label] += count
+    key = own if sort == 'tottime' else total
+    return [
+        (label, own[label], total[label])
+        for label, _ in key.most_common(top)
+    ]
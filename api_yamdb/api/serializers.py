@@ -1,6 +1,6 @@
 from django.conf import settings
 from django.contrib.auth.validators import UnicodeUsernameValidator
-from django.shortcuts import get_object_or_404
+from django.db.models import Q
 
 
 from rest_framework import serializers
@@ -73,7 +73,7 @@ class TitleCreateSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Title
-        fields = '__all__'
+        exclude = ('rating_sum', 'rating_count', 'modified',)
 
 
 class ReviewSerializer(serializers.ModelSerializer):
@@ -89,24 +89,6 @@ class ReviewSerializer(serializers.ModelSerializer):
         model = Review
         fields = ('id', 'text', 'author', 'score', 'pub_date',)
 
-    def validate(self, data):
-        title_id = self.context['view'].kwargs.get('title_id')
-        review_exists = Review.objects.filter(
-            author=self.context['request'].user,
-            title=title_id
-        ).count()
-        title = get_object_or_404(
-            Title,
-            id=title_id
-        )
-
-        if self.context['request'].method == 'POST' and review_exists:
-            raise serializers.ValidationError(
-                f'Отзыв на произведение {title.name} уже существует'
-            )
-
-        return data
-
 
 class UserSerializer(serializers.ModelSerializer):
     username = serializers.CharField(
@@ -158,25 +140,37 @@ class UserCreationSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 'Нельзя использовать "me" в качестве username.'
             )
-        if User.objects.filter(username=data).exists():
-            email = self.initial_data.get('email')
-            existing = User.objects.get(username=data)
-            if existing.email != email:
-                raise serializers.ValidationError(
-                    detail='This name already used'
-                )
         return data
 
-    def validate_email(self, data):
-        if User.objects.filter(email=data).exists():
-            username = self.initial_data.get('username')
-            existing = User.objects.get(email=data)
-            if existing.username != username:
-                raise serializers.ValidationError(
-                    detail='This email already used'
-                )
+    def validate(self, data):
+        """
+        Проверяет занятость username и email одним запросом.
+
+        Повторная регистрация с теми же username и email разрешена:
+        найденный пользователь сохраняется в existing_user и
+        возвращается из save() без повторной вставки.
+        """
+        username, email = data['username'], data['email']
+        self.existing_user = None
+        errors = {}
+        for user in User.objects.filter(
+            Q(username=username) | Q(email=email)
+        )[:2]:
+            if user.username == username and user.email == email:
+                self.existing_user = user
+            elif user.username == username:
+                errors['username'] = ['This name already used']
+            else:
+                errors['email'] = ['This email already used']
+        if errors:
+            raise serializers.ValidationError(errors)
         return data
 
+    def create(self, validated_data):
+        if self.existing_user is not None:
+            return self.existing_user
+        return super().create(validated_data)
+
 
 class GetTokenSerializer(serializers.ModelSerializer):
     username = serializers.CharField(
@@ -190,3 +184,19 @@ class GetTokenSerializer(serializers.ModelSerializer):
         fields = (
             'username', 'confirmation_code',
         )
+
+
+class SuggestQuerySerializer(serializers.Serializer):
+    """Параметры запроса подсказок."""
+    q = serializers.CharField(
+        required=True,
+        allow_blank=True,
+        max_length=settings.LENG_MAX,
+        trim_whitespace=False,
+    )
+    limit = serializers.IntegerField(
+        required=False,
+        min_value=1,
+        max_value=settings.SUGGEST_MAX_LIMIT,
+        default=settings.SUGGEST_LIMIT,
+    )
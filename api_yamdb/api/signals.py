@@ -0,0 +1,76 @@
+"""
+Сигналы приложения api.
+
+Увеличивают версию модели в кэше (см. api.cache) при изменении ее
+записей, чтобы сбросить закэшированные для нее данные, и сбрасывают
+проверку данных JWT-токена при изменении пользователя
+(см. api.authentication). Обновляют индексы подсказок (см. api.suggest).
+"""
+
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from reviews.models import Category, Genre, GenreTitle, Review, Title
+from users.models import User
+
+from .authentication import forget_user
+from .cache import bump_model_version
+from .suggest import SUGGEST_MODELS, update_suggestions
+
+# Модель, записи которой меняются -> модель, версию которой нужно сбросить.
+VERSIONED_MODELS = {
+    Category: Category,
+    Genre: Genre,
+    Title: Title,
+    GenreTitle: Title,
+    # Отзывы меняют рейтинг произведений (см. TitleViewSet).
+    Review: Review,
+    User: User,
+}
+
+
+def bump_version(sender, **kwargs):
+    bump_model_version(VERSIONED_MODELS[sender])
+
+
+def bump_version_on_m2m(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_model_version(VERSIONED_MODELS[sender])
+
+
+for sender in VERSIONED_MODELS:
+    post_save.connect(bump_version, sender=sender)
+    post_delete.connect(bump_version, sender=sender)
+m2m_changed.connect(bump_version_on_m2m, sender=GenreTitle)
+
+
+def bump_title_version(sender, **kwargs):
+    bump_model_version(Title)
+
+
+# Удаление категории обнуляет category произведений (SET_NULL) одним
+# UPDATE без сигналов Title, поэтому версия Title сбрасывается явно.
+for sender in (Category, Genre):
+    post_delete.connect(bump_title_version, sender=sender)
+
+
+def forget_checked_claims(sender, instance, **kwargs):
+    forget_user(instance.pk)
+
+
+post_save.connect(forget_checked_claims, sender=User)
+post_delete.connect(forget_checked_claims, sender=User)
+
+
+def add_suggestion(sender, instance, raw=False, **kwargs):
+    if not raw:
+        update_suggestions(sender, instance)
+
+
+def remove_suggestion(sender, instance, **kwargs):
+    update_suggestions(sender, instance, deleted=True)
+
+
+# Подключаются после bump_version: индекс запоминает новую версию модели.
+for sender in SUGGEST_MODELS:
+    post_save.connect(add_suggestion, sender=sender)
+    post_delete.connect(remove_suggestion, sender=sender)
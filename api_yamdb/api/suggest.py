@@ -0,0 +1,204 @@
+"""
+Подсказки по префиксу для названий произведений, жанров и категорий.
+
+Для каждой модели в памяти процесса хранится PrefixIndex -
+отсортированный список ключей, по которому префикс ищется двоичным
+поиском, так что подсказка не обращается к БД. Индекс строится при
+первом запросе и обновляется по одной записи сигналами (см.
+api.signals) после фиксации транзакции, так что откаченные изменения
+в него не попадают.
+
+Вместе с индексом запоминается версия модели из кэша (см. api.cache):
+если версию увеличил другой процесс, индекс строится заново. Поэтому
+при нескольких процессах-воркерах версии должны храниться в общем кэше
+(CACHE_BACKEND - файловый кэш, Redis, Memcached). С кэшем в памяти
+процесса другие воркеры не видят изменений, и их индексы обновляются
+только перестроением раз в SUGGEST_INDEX_TIMEOUT секунд - это же
+перестроение исправляет индекс, если версия увеличилась раньше, чем
+изменение стало видно в БД.
+"""
+
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db import transaction
+
+from core.db import read_from_primary
+from reviews.models import Category, Genre, Title
+
+from .cache import get_model_version
+
+
+def normalize(text):
+    return ' '.join(text.casefold().split())
+
+
+class PrefixIndex:
+    """
+    Индекс строк с поиском по префиксу.
+
+    Строка находится как по началу, так и по началу любого слова в ней.
+    Совпадения с началом строки возвращаются первыми, внутри групп -
+    в алфавитном порядке.
+    """
+
+    def __init__(self, items=()):
+        """items - тройки (pk, строка, значение), сортируются один раз."""
+        self._starts = []
+        self._words = []
+        self._items = {}
+        for pk, text, value in items:
+            key = normalize(text)
+            self._items[pk] = (key, value)
+            self._starts.append((key, pk))
+            self._words.extend(
+                (word_key, pk) for word_key in self._word_keys(key)
+            )
+        self._starts.sort()
+        self._words.sort()
+
+    @staticmethod
+    def _word_keys(key):
+        position = key.find(' ')
+        while position != -1:
+            yield key[position + 1:]
+            position = key.find(' ', position + 1)
+
+    def add(self, pk, text, value):
+        """Добавляет или заменяет строку с первичным ключом pk."""
+        self.remove(pk)
+        key = normalize(text)
+        self._items[pk] = (key, value)
+        insort(self._starts, (key, pk))
+        for word_key in self._word_keys(key):
+            insort(self._words, (word_key, pk))
+
+    def remove(self, pk):
+        item = self._items.pop(pk, None)
+        if item is None:
+            return
+        key = item[0]
+        self._delete(self._starts, (key, pk))
+        for word_key in self._word_keys(key):
+            self._delete(self._words, (word_key, pk))
+
+    @staticmethod
+    def _delete(keys, entry):
+        index = bisect_left(keys, entry)
+        if index < len(keys) and keys[index] == entry:
+            del keys[index]
+
+    def search(self, prefix, limit):
+        """Возвращает до limit значений строк, подходящих под prefix."""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        found = {}
+        for keys in (self._starts, self._words):
+            index = bisect_left(keys, (prefix,))
+            while (
+                len(found) < limit
+                and index < len(keys)
+                and keys[index][0].startswith(prefix)
+            ):
+                pk = keys[index][1]
+                if pk not in found:
+                    found[pk] = self._items[pk][1]
+                index += 1
+        return list(found.values())
+
+
+# Ключ ответа и поля записи, которые возвращаются в подсказке.
+SUGGEST_MODELS = {
+    Title: ('titles', ('id', 'name', 'year')),
+    Genre: ('genres', ('name', 'slug')),
+    Category: ('categories', ('name', 'slug')),
+}
+
+
+_indexes = {}
+_lock = threading.Lock()
+
+
+def _build_index(model):
+    fields = SUGGEST_MODELS[model][1]
+    with read_from_primary():
+        rows = list(model.objects.order_by().values('pk', *fields))
+    return PrefixIndex((row.pop('pk'), row['name'], row) for row in rows)
+
+
+def _is_fresh(entry, version):
+    entry_version, built_at, _ = entry
+    return (
+        entry_version == version
+        and time.monotonic() - built_at < settings.SUGGEST_INDEX_TIMEOUT
+    )
+
+
+def _get_index(model):
+    """
+    Индекс модели, построенный заново, если модель менялась или индекс
+    старше SUGGEST_INDEX_TIMEOUT секунд.
+    """
+    version = get_model_version(model)
+    entry = _indexes.get(model)
+    if entry is not None and _is_fresh(entry, version):
+        return entry[2]
+    with _lock:
+        entry = _indexes.get(model)
+        if entry is None or not _is_fresh(entry, version):
+            entry = (version, time.monotonic(), _build_index(model))
+            _indexes[model] = entry
+        return entry[2]
+
+
+def _apply_update(model, pk, name, value):
+    with _lock:
+        entry = _indexes.get(model)
+        if entry is None:
+            return
+        _, built_at, index = entry
+        if value is None:
+            index.remove(pk)
+        else:
+            index.add(pk, name, value)
+        _indexes[model] = (get_model_version(model), built_at, index)
+
+
+def update_suggestions(model, instance, deleted=False):
+    """
+    Обновляет запись в индексе модели после фиксации транзакции, если
+    индекс уже построен.
+
+    pk и значения полей запоминаются сразу: к моменту фиксации Django
+    обнуляет pk удаленного объекта. Версия модели к этому моменту уже
+    увеличена, поэтому индекс запоминает новую версию и не строится
+    заново. Время построения не меняется: перестроение по
+    SUGGEST_INDEX_TIMEOUT не откладывается.
+    """
+    pk, name, value = instance.pk, instance.name, None
+    if not deleted:
+        fields = SUGGEST_MODELS[model][1]
+        value = {field: getattr(instance, field) for field in fields}
+    transaction.on_commit(
+        lambda: _apply_update(model, pk, name, value)
+    )
+
+
+def forget_suggestions():
+    """Сбрасывает все индексы, они построятся при следующем запросе."""
+    with _lock:
+        _indexes.clear()
+
+
+def suggest(prefix, limit):
+    """Подсказки по префиксу: {ключ ответа: [данные записей]}."""
+    result = {}
+    for model, (key, _) in SUGGEST_MODELS.items():
+        index = _get_index(model)
+        # Индекс может меняться сигналами из других потоков.
+        with _lock:
+            result[key] = index.search(prefix, limit)
+    return result
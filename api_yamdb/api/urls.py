@@ -4,6 +4,7 @@ URLs приложения api.
 router.urls включает адреса для доступа api к
 моделям проекта. auth/token/ и auth/signup/ - это
 адреса для регистрации и аутентификации пользователя.
+suggest/ - подсказки по префиксу названия.
 '''
 
 from django.urls import include, path
@@ -19,6 +20,7 @@ from .views import (
     UserViewSet,
     get_jwt_token,
     signup,
+    suggest_names,
 )
 
 router = DefaultRouter()
@@ -36,4 +38,5 @@ urlpatterns = [
     path('', include(router.urls)),
     path('auth/token/', get_jwt_token, name='token'),
     path('auth/signup/', signup, name='signup'),
+    path('suggest/', suggest_names, name='suggest'),
 ]
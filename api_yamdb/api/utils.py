@@ -3,19 +3,23 @@
 """
 
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
 from django.conf import settings
 
+from users.outbox import enqueue_mail
+
 
 def mail_confirmation(request, user):
-    """Подтверждение на почту."""
+    """
+    Подтверждение на почту.
+
+    Письмо ставится в очередь и отправляется командой send_outbox.
+    """
 
     confirmation_code = default_token_generator.make_token(user)
 
-    send_mail(
+    enqueue_mail(
         'Тема письма',
         confirmation_code,
         settings.MAIL,
-        [user.email],
-        fail_silently=False,
+        user.email,
     )
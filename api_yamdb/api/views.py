@@ -2,26 +2,41 @@
 Функции-представления приложения api.
 '''
 
+from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
+from django.core.exceptions import PermissionDenied
+from django.db import IntegrityError, transaction
+from django.db.models import Sum
+from django.http import Http404, HttpResponse
 from django.shortcuts import get_object_or_404
-from django.db.models import Avg
+from django.views.decorators.http import require_GET
 
 from django_filters.rest_framework import DjangoFilterBackend
 
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.filters import SearchFilter
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
-
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.settings import api_settings
 
 from reviews.models import Category, Genre, Review, Title
 from users.models import User
 
 
+from .authentication import access_token_for_user, is_admin_request
 from .filters import TitleFilter
-from .mixins import ListCreateDestroyViewSet, NotPUTViewSet
+from .metrics import CONTENT_TYPE, render_metrics
+from .mixins import (
+    CachedListMixin,
+    ConditionalGetMixin,
+    CursorPaginationMixin,
+    ListCreateDestroyViewSet,
+    NotPUTViewSet,
+    QueryBudgetMixin,
+    ReplicaReadMixin
+)
+from .pagination import CachedCountPagination
 from .permissions import (
     AdminOnly,
     AdminOrReadOnly,
@@ -35,13 +50,17 @@ from .serializers import (
     ReviewSerializer,
     UserCreationSerializer,
     TitleCreateSerializer,
+    SuggestQuerySerializer,
     TitleSerializer,
     UserSerializer
 )
+from .suggest import suggest
 from .utils import mail_confirmation
 
 
-class CategoryViewSet(ListCreateDestroyViewSet):
+class CategoryViewSet(
+    ReplicaReadMixin, CachedListMixin, ListCreateDestroyViewSet
+):
     '''
     При GET-запросе возвращает список всех экземпляров класса Category
     c функцией поиска по name. GET-запрос доступен всем пользователям.
@@ -52,6 +71,8 @@ class CategoryViewSet(ListCreateDestroyViewSet):
 
     Метод DELETE доступен только администратору. При удалении обязательно
     поле slug.
+
+    Ответ на GET-запрос кэшируется до следующего изменения Category.
     '''
 
     queryset = Category.objects.all()
@@ -62,7 +83,9 @@ class CategoryViewSet(ListCreateDestroyViewSet):
     search_fields = ('name',)
 
 
-class GenreViewSet(ListCreateDestroyViewSet):
+class GenreViewSet(
+    ReplicaReadMixin, CachedListMixin, ListCreateDestroyViewSet
+):
     '''
     При GET-запросе возвращает список всех экземпляров класса Genre
     c функцией поиска по name. GET-запрос доступен всем пользователям.
@@ -73,6 +96,8 @@ class GenreViewSet(ListCreateDestroyViewSet):
 
     Метод DELETE доступен только администратору. При удалении обязательно
     поле slug.
+
+    Ответ на GET-запрос кэшируется до следующего изменения Genre.
     '''
 
     queryset = Genre.objects.all()
@@ -83,7 +108,9 @@ class GenreViewSet(ListCreateDestroyViewSet):
     search_fields = ('name',)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(
+    ReplicaReadMixin, ConditionalGetMixin, viewsets.ModelViewSet
+):
     '''
     При GET-запросе возвращает список всех экземпляров класса Title
     c фильтрацией по name, genre, category и year или вернет конретный
@@ -96,14 +123,26 @@ class TitleViewSet(viewsets.ModelViewSet):
     еще не вышло. Валидация идет на уровне модели.
 
     Методы PATCH и DELETE доступны только администратору.
+
+    GET-запросы поддерживают ETag: если произведения,
+    их рейтинг, категории и жанры не менялись, возвращается ответ 304.
     '''
 
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score')).order_by('rating')
+    queryset = Title.objects.select_related('category').prefetch_related(
+        'genre'
+    ).order_by('rating')
     serializer_class = TitleSerializer
+    pagination_class = CachedCountPagination
     permission_classes = (AdminOrReadOnly,)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
+    etag_aggregates = {
+        'rating_sum': Sum('rating_sum'),
+        'rating_count': Sum('rating_count'),
+    }
+    etag_models = (Category, Genre)
+    # Рейтинг меняется отзывами, поэтому в ETag списка входит и Review.
+    list_etag_models = (Title, Category, Genre, Review)
 
     def get_serializer_class(self):
         if self.request.method in ('POST', 'PATCH',):
@@ -111,7 +150,13 @@ class TitleViewSet(viewsets.ModelViewSet):
         return TitleSerializer
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(
+    ReplicaReadMixin,
+    QueryBudgetMixin,
+    ConditionalGetMixin,
+    CursorPaginationMixin,
+    viewsets.ModelViewSet
+):
     '''
     При GET-запросе возвращает список всех экземпляров класса Review
     относящийся к определенному экземпляру класса Title или вернет конретный
@@ -120,24 +165,58 @@ class ReviewViewSet(viewsets.ModelViewSet):
 
     При POST-запросе создаст экземпляр класса Review. Правом создания
     обладают только аутентифицированные пользователи. Нельзя написать
-    несколько отзывов на одно произведение. Валидация идет на уровне модели.
+    несколько отзывов на одно произведение. Валидация идет на уровне модели:
+    повторный отзыв отсекает ограничение unique_review, и вместо ошибки
+    БД возвращается ответ со статусом 400.
 
     Методы PATCH и DELETE доступны автору, модератору и администратору.
+
+    С параметром pagination=cursor список отдается с курсорной пагинацией.
     '''
 
     serializer_class = ReviewSerializer
     permission_classes = (AuthorModeratorAdminOrReadOnly,)
+    query_budget = 5
+    etag_models = (User,)
+
+    def get_title(self):
+        """Произведение из URL, загружается один раз за запрос."""
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title, id=self.kwargs.get('title_id')
+            )
+        return self._title
 
     def get_queryset(self):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        return title.reviews.all()
+        return self.get_title().reviews.select_related('author').only(
+            'id', 'text', 'score', 'pub_date', 'modified', 'title',
+            'author__username'
+        )
 
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        serializer.save(author=self.request.user, title=title)
-
-
-class CommentViewSet(viewsets.ModelViewSet):
+        title = self.get_title()
+        try:
+            with transaction.atomic():
+                serializer.save(author=self.request.user, title=title)
+        except IntegrityError:
+            if not Review.objects.filter(
+                title=title, author=self.request.user
+            ).exists():
+                raise
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    f'Отзыв на произведение {title.name} уже существует'
+                ]
+            })
+
+
+class CommentViewSet(
+    ReplicaReadMixin,
+    QueryBudgetMixin,
+    ConditionalGetMixin,
+    CursorPaginationMixin,
+    viewsets.ModelViewSet
+):
     '''
     При GET-запросе возвращает список всех экземпляров класса Comment
     относящийся к определенному экземпляру класса Review и Title
@@ -148,22 +227,41 @@ class CommentViewSet(viewsets.ModelViewSet):
     обладают только аутентифицированные пользователи.
 
     Методы PATCH и DELETE доступны автору, модератору и администратору.
+
+    С параметром pagination=cursor список отдается с курсорной пагинацией.
+
+    Автор загружается тем же запросом, что и комментарии (только
+    username). В режиме DEBUG запросы сверх query_budget пишутся в лог.
+    GET-запросы поддерживают ETag, в него входит версия пользователей,
+    так как в ответе есть username автора.
     '''
 
     serializer_class = CommentSerializer
     permission_classes = (AuthorModeratorAdminOrReadOnly,)
+    query_budget = 5
+    etag_models = (User,)
+
+    def get_review(self):
+        """
+        Отзыв из URL, проверенный на принадлежность произведению.
+        Загружается одним запросом один раз за запрос.
+        """
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review,
+                id=self.kwargs.get('review_id'),
+                title_id=self.kwargs.get('title_id'),
+            )
+        return self._review
 
     def get_queryset(self):
-        title_id = self.kwargs.get('title_id')
-        review_id = self.kwargs.get('review_id')
-        review = get_object_or_404(Review, id=review_id, title=title_id)
-        return review.comments.all()
+        return self.get_review().comments.select_related('author').only(
+            'id', 'text', 'pub_date', 'modified', 'review',
+            'author__username'
+        )
 
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        reviews = title.reviews.all()
-        review = get_object_or_404(reviews, id=self.kwargs.get('review_id'))
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.request.user, review=self.get_review())
 
 
 class UserViewSet(NotPUTViewSet):
@@ -188,7 +286,7 @@ class UserViewSet(NotPUTViewSet):
     permission_classes = (AdminOnly,)
     filter_backends = (DjangoFilterBackend, SearchFilter,)
     lookup_field = "username"
-    pagination_class = PageNumberPagination
+    pagination_class = CachedCountPagination
     search_fields = ['username', ]
 
     @action(
@@ -196,18 +294,20 @@ class UserViewSet(NotPUTViewSet):
         permission_classes=(permissions.IsAuthenticated,)
     )
     def me(self, request):
+        # request.user может быть собран из токена без профиля.
+        user = get_object_or_404(User, pk=request.user.pk)
         if request.method == 'GET':
-            serializer = UserSerializer(request.user)
+            serializer = UserSerializer(user)
             return Response(serializer.data, status=status.HTTP_200_OK)
 
         if request.method == 'PATCH':
             serializer = UserSerializer(
-                request.user,
+                user,
                 data=request.data,
                 partial=True
             )
             if serializer.is_valid():
-                serializer.save(role=request.user.role)
+                serializer.save(role=user.role)
                 return Response(serializer.data, status=status.HTTP_200_OK)
             return Response(
                 serializer.errors, status=status.HTTP_400_BAD_REQUEST
@@ -221,14 +321,7 @@ def signup(request):
     if request.method == 'POST':
         serializer = UserCreationSerializer(data=request.data)
         if serializer.is_valid():
-            if not User.objects.filter(
-                username=serializer.validated_data['username'],
-                email=serializer.validated_data['email']
-            ).exists():
-                serializer.save()
-            username = serializer.data['username']
-            email = serializer.data['email']
-            user = get_object_or_404(User, username=username, email=email)
+            user = serializer.save()
             mail_confirmation(request, user)
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -245,8 +338,7 @@ def get_jwt_token(request):
             username = serializer.data['username']
             confirmation_code = serializer.data['confirmation_code']
             user = get_object_or_404(User, username=username)
-            tokens = RefreshToken.for_user(user)
-            access = str(tokens.access_token)
+            access = str(access_token_for_user(user))
             if default_token_generator.check_token(user, confirmation_code):
                 return Response({'token': access}, status=status.HTTP_200_OK)
             return Response(
@@ -254,3 +346,38 @@ def get_jwt_token(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def suggest_names(request):
+    """
+    Подсказки по префиксу q для названий произведений, жанров и
+    категорий, не более limit каждого вида. Ищутся в индексе в памяти
+    процесса, без запросов к БД.
+    """
+    serializer = SuggestQuerySerializer(data=request.query_params)
+    serializer.is_valid(raise_exception=True)
+    return Response(suggest(
+        serializer.validated_data['q'], serializer.validated_data['limit']
+    ))
+
+
+@require_GET
+def metrics(request):
+    """
+    Метрики в текстовом формате Prometheus.
+
+    Доступны администратору (сессия или JWT-токен) и клиентам с адресом
+    из METRICS_ALLOWED_IPS. Адрес берется из REMOTE_ADDR: за
+    балансировщиком в список нужно добавлять адрес балансировщика и
+    закрывать /metrics от внешних запросов на нем.
+    """
+    if not settings.METRICS:
+        raise Http404
+    if not (
+        request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS
+        or is_admin_request(request)
+    ):
+        raise PermissionDenied
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE)
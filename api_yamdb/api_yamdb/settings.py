@@ -43,6 +43,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.RequestTimingMiddleware',
+    'api.middleware.NPlusOneMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -50,8 +52,43 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.ProfilingMiddleware',
 ]
 
+# Замер запросов к БД, сериализации и общего времени каждого запроса
+# (заголовок Server-Timing и лог api.timing), см. api.middleware.
+REQUEST_TIMING = os.getenv('REQUEST_TIMING', '').lower() in ('1', 'true')
+
+# Метрики в формате Prometheus по адресу /metrics, см. api.metrics.
+# Выключены по умолчанию, METRICS=1 включает. METRICS_DIR - общий
+# каталог, через который метрики суммируются по процессам-воркерам; без
+# него метрики считаются в памяти процесса. Адрес доступен
+# администраторам и адресам из METRICS_ALLOWED_IPS=<ip>[,<ip>...]
+# (например, серверу Prometheus).
+METRICS = os.getenv('METRICS', '').lower() in ('1', 'true')
+METRICS_DIR = os.getenv('METRICS_DIR') or None
+METRICS_ALLOWED_IPS = [
+    ip.strip()
+    for ip in os.getenv('METRICS_ALLOWED_IPS', '').split(',') if ip.strip()
+]
+
+# Поиск N+1 запросов, см. api.nplusone: 'warn' - предупреждение в лог,
+# 'raise' - исключение (в тестах), None - выключен. Запрос считается
+# N+1, если одинаковый по структуре SELECT выполнен NPLUSONE_THRESHOLD
+# раз за один HTTP-запрос.
+NPLUSONE = 'warn' if DEBUG else None
+NPLUSONE_THRESHOLD = 3
+
+# Профилирование запросов, см. api.profiling. Без PROFILING_DIR
+# выключено; иначе профилируются запросы администратора с заголовком
+# X-Profile и доля PROFILING_SAMPLE_RATE остальных запросов.
+# PROFILING_MODE: 'cprofile' (файлы .prof) или 'sample' (сэмплер стека
+# с интервалом PROFILING_INTERVAL секунд, файлы .collapsed).
+PROFILING_DIR = os.getenv('PROFILING_DIR') or None
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', '0'))
+PROFILING_MODE = os.getenv('PROFILING_MODE', 'cprofile')
+PROFILING_INTERVAL = 0.001
+
 ROOT_URLCONF = 'api_yamdb.urls'
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
@@ -80,9 +117,63 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Соединение переиспользуется между запросами в течение
+        # CONN_MAX_AGE секунд, 0 - новое соединение на каждый запрос.
+        'CONN_MAX_AGE': int(os.getenv('CONN_MAX_AGE', 60)),
+    }
+}
+
+# Реплики только для чтения: DATABASE_REPLICAS=<путь>[,<путь>...] -
+# файлы SQLite с копией default. Получают псевдонимы replica1, replica2...
+READ_REPLICAS = []
+for index, path in enumerate(
+    filter(None, os.getenv('DATABASE_REPLICAS', '').split(',')), start=1
+):
+    READ_REPLICAS.append(f'replica{index}')
+    DATABASES[f'replica{index}'] = {
+        **DATABASES['default'],
+        'NAME': path.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['core.db.ReplicaRouter']
+
+# Сколько секунд после записи пользователь читает из default, а не из
+# реплики.
+REPLICA_PIN_SECONDS = 5
+
+# PRAGMA, которые выполняются при открытии каждого соединения с SQLite
+# (см. core.db). Пустой словарь оставляет настройки SQLite по умолчанию.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    # Сколько миллисекунд ждать снятия блокировки перед ошибкой
+    # "database is locked".
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    # Отрицательное значение - размер кэша страниц в килобайтах.
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+
+# Cache
+# По умолчанию кэш хранится в памяти процесса. Для общего кэша нескольких
+# процессов: CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache
+# и CACHE_LOCATION=<каталог>.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
     }
 }
 
+# Время жизни закэшированных ответов списков категорий и жанров.
+LIST_CACHE_TIMEOUT = 60 * 60 * 24
+
 
 # Password validation
 
@@ -144,17 +235,56 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.ClaimsJWTAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     "PAGE_SIZE": 5,
 }
 
+# Через сколько секунд закэшированное количество записей для
+# CachedCountPagination пересчитывается в фоне.
+PAGINATION_COUNT_TIMEOUT = 60
+
+# Курсорная пагинация для отзывов и комментариев без параметра
+# pagination=cursor в запросе.
+CURSOR_PAGINATION = False
+
+# Количество подсказок /api/v1/suggest/ по умолчанию и максимальное.
+SUGGEST_LIMIT = 10
+SUGGEST_MAX_LIMIT = 50
+# Через сколько секунд индекс подсказок строится заново, даже если версия
+# модели не менялась (см. api.suggest).
+SUGGEST_INDEX_TIMEOUT = int(os.getenv('SUGGEST_INDEX_TIMEOUT', 300))
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=30),
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Сколько секунд данные пользователя из JWT-токена считаются актуальными
+# без сверки с БД. None - не сверять никогда, 0 - сверять каждый запрос.
+JWT_CLAIMS_CACHE_TIMEOUT = 60
+
 AUTH_USER_MODEL = 'users.User'
 
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'api.timing': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+        'api.nplusone': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+        },
+    },
+}
+
 BANNED_NAMES = ['me']
@@ -3,16 +3,20 @@ URLs проекта.
 
 По адресу 'api/v1/ доступны взаимодействия c api проекта.
 По адресу 'redoc/' находится документация api.
+По адресу 'metrics' отдаются метрики в формате Prometheus.
 '''
 
 from django.contrib import admin
 from django.urls import include, path
 from django.views.generic import TemplateView
 
+from api.views import metrics
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/v1/', include('api.urls')),
     path('redoc/',
          TemplateView.as_view(template_name='redoc.html'),
          name='redoc'),
+    path('metrics', metrics, name='metrics'),
 ]
@@ -0,0 +1,125 @@
+"""
+Настройка соединений с базой данных.
+
+При открытии каждого соединения с SQLite выполняет PRAGMA из
+settings.SQLITE_PRAGMAS: журнал WAL позволяет читать параллельно с
+записью, busy_timeout заставляет писателя ждать освобождения базы
+вместо ошибки "database is locked".
+
+ReplicaRouter направляет чтение на реплики из settings.READ_REPLICAS,
+но только внутри read_from_replica(), то есть для запросов, которые
+явно это разрешили (см. api.mixins.ReplicaReadMixin). Запись всегда
+идет в default. После записи клиент на REPLICA_PIN_SECONDS
+закрепляется за default, чтобы сразу увидеть свои изменения, даже
+если реплика еще отстает. Закрепление хранится в подписанной cookie,
+поэтому работает при любом числе процессов и любом бэкенде кэша.
+
+read_from_primary() возвращает чтение в default внутри
+read_from_replica(). Через него читаются данные, которые кладутся в
+кэш под текущей версией модели (см. api.cache): реплика может еще не
+видеть изменение, после которого версия увеличилась, и устаревшие
+данные остались бы в кэше под новой версией.
+"""
+
+import random
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.signing import BadSignature
+from django.db import DEFAULT_DB_ALIAS
+
+PIN_COOKIE = 'replica_pin'
+PIN_SALT = 'core.db.replica-pin'
+
+_state = threading.local()
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """Применяет settings.SQLITE_PRAGMAS к новому соединению с SQLite."""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+    if not pragmas:
+        return
+    # Выполняется на самом соединении sqlite3, чтобы PRAGMA не попадали
+    # в connection.queries и не влияли на подсчет запросов.
+    for name, value in pragmas.items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
+
+
+def pin_to_primary(response):
+    """Закрепляет чтение клиента за default после записи."""
+    if settings.READ_REPLICAS:
+        response.set_signed_cookie(
+            PIN_COOKIE,
+            '1',
+            salt=PIN_SALT,
+            max_age=settings.REPLICA_PIN_SECONDS,
+            httponly=True,
+            samesite='Lax',
+        )
+
+
+def is_pinned_to_primary(request):
+    """Клиент записывал данные не раньше REPLICA_PIN_SECONDS назад."""
+    try:
+        request.get_signed_cookie(
+            PIN_COOKIE, salt=PIN_SALT, max_age=settings.REPLICA_PIN_SECONDS
+        )
+    except (KeyError, BadSignature):
+        return False
+    return True
+
+
+@contextmanager
+def _use_replica(alias):
+    previous = getattr(_state, 'replica', None)
+    _state.replica = alias
+    try:
+        yield alias
+    finally:
+        _state.replica = previous
+
+
+@contextmanager
+def read_from_replica():
+    """
+    Направляет чтение в текущем потоке на одну из реплик.
+
+    Реплика выбирается один раз, чтобы все запросы к БД внутри блока
+    видели одно и то же состояние данных.
+    """
+    if not settings.READ_REPLICAS:
+        yield None
+        return
+    with _use_replica(random.choice(settings.READ_REPLICAS)) as alias:
+        yield alias
+
+
+def read_from_primary():
+    """Направляет чтение в текущем потоке в default."""
+    return _use_replica(None)
+
+
+class ReplicaRouter:
+    """Роутер реплик для чтения."""
+
+    def db_for_read(self, model, **hints):
+        return getattr(_state, 'replica', None)
+
+    def db_for_write(self, model, **hints):
+        # Объект, прочитанный с реплики, все равно сохраняется в default.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.READ_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Реплики - копии default, миграции на них не применяются.
+        if db in settings.READ_REPLICAS:
+            return False
+        return None
@@ -37,6 +37,9 @@ class ReviewAndCommentModel(models.Model):
     pub_date = models.DateTimeField(
         auto_now_add=True,
     )
+    modified = models.DateTimeField(
+        auto_now=True,
+    )
 
     class Meta:
         abstract = True
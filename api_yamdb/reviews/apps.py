@@ -3,8 +3,23 @@
 '''
 
 from django.apps import AppConfig
+from django.db import connections
+from django.db.models.signals import post_migrate
+
+
+def restore_search_index(sender, using, **kwargs):
+    '''
+    Восстанавливает триггеры поиска после migrate: миграции, которые
+    пересоздают таблицу reviews_title в SQLite, удаляют их.
+    '''
+    from .search import ensure_search_index
+    ensure_search_index(connections[using])
 
 
 class ReviewsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'reviews'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        post_migrate.connect(restore_search_index, sender=self)
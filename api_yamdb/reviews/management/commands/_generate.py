@@ -0,0 +1,309 @@
+"""
+Генерация синтетических данных в формате csv-файлов load_data.
+
+Строки пишутся в файл по мере генерации, поэтому расход памяти зависит
+только от количества произведений (для них хранится число отзывов),
+но не от количества отзывов и комментариев.
+
+Популярность произведений и отзывов распределена по закону Ципфа с
+показателем skew: несколько произведений получают большую часть
+отзывов, а несколько отзывов - большую часть комментариев. Каждый файл
+генерируется своим random.Random, зависящим только от seed и имени
+файла, так что одинаковые параметры дают одинаковые файлы.
+"""
+
+import csv
+import math
+import os
+import random
+import time
+
+ROLE_WEIGHTS = (('user', 98), ('moderator', 1.5), ('admin', 0.5))
+
+CATEGORY_NAMES = (
+    'Фильм', 'Книга', 'Музыка', 'Сериал', 'Игра', 'Комикс', 'Спектакль',
+    'Картина', 'Подкаст', 'Мультфильм',
+)
+
+GENRE_NAMES = (
+    'Драма', 'Комедия', 'Вестерн', 'Фэнтези', 'Фантастика', 'Детектив',
+    'Триллер', 'Сказка', 'Гонзо', 'Ужасы', 'Роман', 'Рок', 'Классика',
+    'Шансон', 'Джаз', 'Документальный', 'Артхаус', 'Приключения',
+)
+
+TITLE_WORDS = (
+    'ночь', 'город', 'дорога', 'звезда', 'море', 'тень', 'огонь', 'зима',
+    'песня', 'сад', 'остров', 'ветер', 'мост', 'камень', 'река', 'свет',
+    'время', 'дом', 'небо', 'поле', 'лес', 'сердце', 'берег', 'гора',
+)
+
+TITLE_ADJECTIVES = (
+    'Последний', 'Тихий', 'Белый', 'Долгий', 'Черный', 'Далекий', 'Новый',
+    'Старый', 'Золотой', 'Красный', 'Забытый', 'Вечный', 'Легкий',
+)
+
+REVIEW_TEXTS = (
+    'Смотрел на одном дыхании.',
+    'Ничего особенного, но вечер скоротать можно.',
+    'Пересматривал несколько раз, каждый раз нахожу что-то новое.',
+    'Слишком затянуто, к середине стало скучно.',
+    'Лучшее, что я видел за последний год!',
+    'Сильная работа, но финал подкачал.',
+    'Не понимаю восторгов, обычная поделка.',
+    'Рекомендую всем, кто любит жанр.',
+)
+
+COMMENT_TEXTS = (
+    'Полностью согласен.',
+    'Не соглашусь, мне понравилось.',
+    'Спасибо за отзыв, посмотрю.',
+    'А мне кажется, вы не поняли замысел.',
+    'Ну наконец-то честный отзыв.',
+    'Оценка явно завышена.',
+)
+
+# Фиксированный интервал, чтобы файлы не зависели от текущей даты.
+FIRST_YEAR = 1920
+LAST_YEAR = 2023
+
+# Отзывы датируются в пределах этого интервала, комментарии - не
+# раньше отзыва и не позже чем через COMMENT_DELAY секунд после него.
+REVIEW_START = 1420070400  # 2015-01-01T00:00:00Z
+REVIEW_SPAN = 10 * 365 * 24 * 60 * 60
+COMMENT_DELAY = 30 * 24 * 60 * 60
+
+# Множитель для перемешивания id при расчете даты отзыва.
+HASH_MULTIPLIER = 2654435761
+
+WRITE_CHUNK = 10000
+
+
+class Generator:
+    """
+    Генерирует csv-файлы для load_data в каталог output_dir.
+
+    counts - словарь с количеством строк: users, categories, genres,
+    titles, reviews, comments. Категорий и жанров не больше, чем
+    названий в CATEGORY_NAMES и GENRE_NAMES, пользователей не меньше
+    одного.
+    """
+
+    def __init__(self, output_dir, counts, seed=0, skew=1.0, stdout=None):
+        self.output_dir = output_dir
+        self.counts = dict(counts)
+        self.seed = seed
+        self.skew = skew
+        self.stdout = stdout
+
+    def rng(self, filename):
+        return random.Random(f'{self.seed}:{filename}')
+
+    def write(self, filename, header, rows):
+        """Пишет строки в файл пачками, возвращает их количество."""
+        started = time.monotonic()
+        written = 0
+        path = os.path.join(self.output_dir, filename)
+        with open(path, 'w', encoding='utf-8', newline='') as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(header)
+            chunk = []
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) == WRITE_CHUNK:
+                    writer.writerows(chunk)
+                    written += len(chunk)
+                    chunk = []
+            writer.writerows(chunk)
+            written += len(chunk)
+        if self.stdout is not None:
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f'{filename}: {written} rows in {elapsed:.2f}s '
+                f'({written / elapsed if elapsed else written:.0f} rows/sec)'
+            )
+        return written
+
+    def generate(self):
+        """Генерирует все файлы в порядке их загрузки."""
+        self.write(
+            'users.csv', ('id', 'username', 'email', 'role', 'bio'),
+            self.users(),
+        )
+        self.write('category.csv', ('id', 'name', 'slug'), self.categories())
+        self.write('genre.csv', ('id', 'name', 'slug'), self.genres())
+        self.write(
+            'titles.csv', ('id', 'name', 'year', 'description', 'category'),
+            self.titles(),
+        )
+        self.write(
+            'genre_title.csv', ('id', 'genre_id', 'title_id'),
+            self.genre_titles(),
+        )
+        self.counts['reviews'] = self.write(
+            'review.csv',
+            ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+            self.reviews(),
+        )
+        self.write(
+            'comments.csv', ('id', 'text', 'pub_date', 'author', 'review_id'),
+            self.comments(),
+        )
+
+    def users(self):
+        rng = self.rng('users.csv')
+        roles, weights = zip(*ROLE_WEIGHTS)
+        for user_id in range(1, self.counts['users'] + 1):
+            role = rng.choices(roles, weights)[0]
+            yield (
+                user_id, f'user{user_id}', f'user{user_id}@yamdb.fake',
+                role, '',
+            )
+
+    def categories(self):
+        for index in range(self.counts['categories']):
+            yield index + 1, CATEGORY_NAMES[index], f'category-{index + 1}'
+
+    def genres(self):
+        for index in range(self.counts['genres']):
+            yield index + 1, GENRE_NAMES[index], f'genre-{index + 1}'
+
+    def titles(self):
+        rng = self.rng('titles.csv')
+        categories = range(1, self.counts['categories'] + 1)
+        category_weights = zipf_weights(len(categories), self.skew)
+        for title_id in range(1, self.counts['titles'] + 1):
+            name = (
+                f'{rng.choice(TITLE_ADJECTIVES)} {rng.choice(TITLE_WORDS)}'
+            )
+            description = ''
+            if rng.random() < 0.7:
+                description = (
+                    f'{name}: {" ".join(rng.sample(TITLE_WORDS, 6))}.'
+                )
+            yield (
+                title_id, name, rng.randint(FIRST_YEAR, LAST_YEAR),
+                description, rng.choices(categories, category_weights)[0],
+            )
+
+    def genre_titles(self):
+        rng = self.rng('genre_title.csv')
+        genres = range(1, self.counts['genres'] + 1)
+        row_id = 0
+        for title_id in range(1, self.counts['titles'] + 1):
+            for genre_id in rng.sample(genres, min(len(genres),
+                                                   rng.randint(1, 3))):
+                row_id += 1
+                yield row_id, genre_id, title_id
+
+    def review_counts(self):
+        """
+        Количество отзывов каждого произведения.
+
+        Распределение по Ципфу, популярные произведения перемешаны по
+        id. На произведение не больше отзывов, чем пользователей, так
+        как пользователь пишет только один отзыв на произведение.
+        """
+        rng = self.rng('review_counts')
+        titles, users = self.counts['titles'], self.counts['users']
+        total = min(self.counts['reviews'], titles * users)
+        weights = zipf_weights(titles, self.skew)
+        rng.shuffle(weights)
+        weight_sum = sum(weights)
+        counts = [
+            min(users, int(total * weight / weight_sum)) for weight in weights
+        ]
+        # Остаток от округления и ограничения раздается по одному отзыву,
+        # начиная с самых популярных произведений.
+        leftover = total - sum(counts)
+        by_weight = sorted(range(titles), key=weights.__getitem__,
+                           reverse=True)
+        while leftover > 0:
+            for index in by_weight:
+                if leftover == 0:
+                    break
+                if counts[index] < users:
+                    counts[index] += 1
+                    leftover -= 1
+        return counts
+
+    def reviews(self):
+        rng = self.rng('review.csv')
+        users = self.counts['users']
+        review_id = 0
+        for title_index, count in enumerate(self.review_counts()):
+            # Разные авторы - значения перестановки (a * j + b) mod users.
+            step = coprime(rng, users)
+            offset = rng.randrange(users)
+            quality = rng.gauss(6.5, 1.5)
+            for index in range(count):
+                review_id += 1
+                score = min(10, max(1, round(rng.gauss(quality, 2))))
+                yield (
+                    review_id,
+                    title_index + 1,
+                    rng.choice(REVIEW_TEXTS),
+                    (step * index + offset) % users + 1,
+                    score,
+                    format_timestamp(self.review_timestamp(review_id)),
+                )
+
+    def review_timestamp(self, review_id):
+        """Дата отзыва вычисляется по id, чтобы не хранить ее."""
+        return REVIEW_START + (
+            (review_id * HASH_MULTIPLIER + self.seed) % REVIEW_SPAN
+        )
+
+    def comments(self):
+        rng = self.rng('comments.csv')
+        reviews, users = self.counts['reviews'], self.counts['users']
+        if not reviews:
+            return
+        # Популярные отзывы разбросаны по id перестановкой рангов.
+        step, offset = coprime(rng, reviews), rng.randrange(reviews)
+        for comment_id in range(1, self.counts['comments'] + 1):
+            rank = zipf_rank(rng, reviews, self.skew)
+            review_id = (step * rank + offset) % reviews + 1
+            timestamp = (
+                self.review_timestamp(review_id)
+                + rng.randrange(COMMENT_DELAY)
+            )
+            yield (
+                comment_id,
+                rng.choice(COMMENT_TEXTS),
+                format_timestamp(timestamp),
+                rng.randint(1, users),
+                review_id,
+            )
+
+
+def zipf_weights(count, skew):
+    return [1 / (rank + 1) ** skew for rank in range(count)]
+
+
+def zipf_rank(rng, count, skew):
+    """
+    Случайный ранг от 0 до count - 1 по непрерывному приближению
+    закона Ципфа, без таблицы весов.
+    """
+    uniform = rng.random()
+    if abs(skew - 1) < 1e-9:
+        value = count ** uniform
+    else:
+        power = 1 - skew
+        value = ((count ** power - 1) * uniform + 1) ** (1 / power)
+    return min(count - 1, int(value) - 1)
+
+
+def coprime(rng, modulus):
+    """Случайный множитель, взаимно простой с modulus."""
+    if modulus == 1:
+        return 1
+    while True:
+        step = rng.randrange(1, modulus)
+        if math.gcd(step, modulus) == 1:
+            return step
+
+
+def format_timestamp(timestamp):
+    """Дата в формате csv-файлов: 2019-09-24T21:08:21.000Z."""
+    return time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime(timestamp))
@@ -0,0 +1,256 @@
+"""
+Вспомогательные функции менеджмент-команд.
+
+Потоковая загрузка csv-файлов в БД: файл читается пачками по
+batch_size строк, каждая пачка вставляется одним bulk_create в
+отдельной транзакции, поэтому расход памяти не зависит от размера файла.
+
+Таблицы без взаимных зависимостей можно загружать параллельно:
+каждая таблица ждет только те, на которые ссылается внешними ключами.
+
+Даты из csv (поле dates таблицы) загружаются как есть: на время
+загрузки таблицы auto_now и auto_now_add этих полей отключаются, иначе
+bulk_create записал бы во все строки время загрузки.
+"""
+
+import os
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from csv import DictReader
+from itertools import islice
+
+from django.db import OperationalError, connection, transaction
+
+from reviews.models import (
+    Category,
+    Comment,
+    GenreTitle,
+    Genre,
+    Review,
+    Title,
+    User
+)
+
+DEFAULT_BATCH_SIZE = 1000
+
+PROGRESS_INTERVAL = 1.0
+
+LOCK_RETRIES = 50
+LOCK_RETRY_DELAY = 0.05
+
+Table = namedtuple(
+    'Table', ('filename', 'model', 'build', 'depends_on', 'dates'),
+    defaults=((), ())
+)
+
+
+def build_user(row):
+    return User(
+        id=row['id'],
+        username=row['username'],
+        email=row['email'],
+        role=row['role'],
+        bio=row['bio']
+    )
+
+
+def build_category(row):
+    return Category(
+        id=row['id'],
+        name=row['name'],
+        slug=row['slug']
+    )
+
+
+def build_genre(row):
+    return Genre(
+        id=row['id'],
+        name=row['name'],
+        slug=row['slug']
+    )
+
+
+def build_title(row):
+    return Title(
+        id=row['id'],
+        name=row['name'],
+        year=row['year'],
+        description=row['description'],
+        category_id=row['category']
+    )
+
+
+def build_genre_title(row):
+    return GenreTitle(
+        id=row['id'],
+        genre_id=row['genre_id'],
+        title_id=row['title_id']
+    )
+
+
+def build_review(row):
+    return Review(
+        id=row['id'],
+        title_id=row['title_id'],
+        text=row['text'],
+        author_id=row['author'],
+        score=row['score'],
+        pub_date=row['pub_date'],
+        modified=row['pub_date']
+    )
+
+
+def build_comment(row):
+    return Comment(
+        id=row['id'],
+        text=row['text'],
+        pub_date=row['pub_date'],
+        modified=row['pub_date'],
+        author_id=row['author'],
+        review_id=row['review_id']
+    )
+
+
+TABLES = (
+    Table('users.csv', User, build_user),
+    Table('category.csv', Category, build_category),
+    Table('genre.csv', Genre, build_genre),
+    Table('titles.csv', Title, build_title, ('category.csv',)),
+    Table(
+        'genre_title.csv', GenreTitle, build_genre_title,
+        ('genre.csv', 'titles.csv')
+    ),
+    Table(
+        'review.csv', Review, build_review, ('users.csv', 'titles.csv'),
+        ('pub_date', 'modified')
+    ),
+    Table(
+        'comments.csv', Comment, build_comment, ('users.csv', 'review.csv'),
+        ('pub_date', 'modified')
+    ),
+)
+
+
+def iter_batches(rows, batch_size):
+    """Разбивает итератор строк на списки длиной не больше batch_size."""
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+@contextmanager
+def source_dates(model, field_names):
+    """Отключает auto_now и auto_now_add полей модели внутри блока."""
+    fields = [model._meta.get_field(name) for name in field_names]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def insert_batch(model, objects):
+    """
+    Вставляет пачку объектов в одной транзакции.
+
+    SQLite допускает только одного писателя, поэтому при параллельной
+    загрузке пачка, упершаяся в блокировку, повторяется с нарастающей
+    паузой.
+    """
+    for attempt in range(LOCK_RETRIES):
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create(objects)
+            return
+        except OperationalError as error:
+            if 'locked' not in str(error) or attempt == LOCK_RETRIES - 1:
+                raise
+            time.sleep(LOCK_RETRY_DELAY * (attempt + 1))
+
+
+def load_table(table, data_dir, batch_size=DEFAULT_BATCH_SIZE, stdout=None):
+    """
+    Загружает один csv-файл в таблицу модели.
+
+    Возвращает количество загруженных строк и затраченное время.
+    Если передан stdout, не чаще раза в PROGRESS_INTERVAL секунд
+    пишет в него прогресс в строках в секунду.
+    """
+    loaded = 0
+    started = last_report = time.monotonic()
+    path = os.path.join(data_dir, table.filename)
+    with open(path, encoding='utf-8', newline='') as csv_file, \
+            source_dates(table.model, table.dates):
+        rows = DictReader(csv_file)
+        for batch in iter_batches(rows, batch_size):
+            objects = [table.build(row) for row in batch]
+            insert_batch(table.model, objects)
+            loaded += len(objects)
+            now = time.monotonic()
+            if stdout is not None and now - last_report >= PROGRESS_INTERVAL:
+                last_report = now
+                stdout.write(
+                    f'  {table.filename}: {loaded} rows, '
+                    f'{loaded / (now - started):.0f} rows/sec'
+                )
+    return loaded, time.monotonic() - started
+
+
+def _load_table_in_thread(*args, **kwargs):
+    """Загружает таблицу и закрывает соединение с БД рабочего потока."""
+    try:
+        return load_table(*args, **kwargs)
+    finally:
+        connection.close()
+
+
+def load_tables(tables, data_dir, batch_size=DEFAULT_BATCH_SIZE, jobs=1,
+                stdout=None):
+    """
+    Загружает таблицы с учетом зависимостей по внешним ключам.
+
+    При jobs > 1 таблицы загружаются в пуле из jobs потоков, у каждого
+    потока свое соединение с БД. Таблица запускается, как только
+    загружены все таблицы из ее depends_on.
+
+    Генерирует кортежи (table, loaded, elapsed) по мере завершения.
+    """
+    if jobs <= 1:
+        for table in tables:
+            yield (table,) + load_table(table, data_dir, batch_size, stdout)
+        return
+
+    pending = list(tables)
+    done = set()
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        running = {}
+        while pending or running:
+            for table in [
+                table for table in pending
+                if done.issuperset(table.depends_on)
+            ]:
+                pending.remove(table)
+                future = executor.submit(
+                    _load_table_in_thread,
+                    table, data_dir, batch_size, stdout
+                )
+                running[future] = table
+            if not running:
+                raise ValueError(
+                    'Unresolvable table dependencies: '
+                    + ', '.join(table.filename for table in pending)
+                )
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                table = running.pop(future)
+                loaded, elapsed = future.result()
+                done.add(table.filename)
+                yield table, loaded, elapsed
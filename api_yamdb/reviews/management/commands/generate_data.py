@@ -0,0 +1,108 @@
+"""
+Генерация синтетических данных для нагрузочного тестирования.
+"""
+
+import os
+import time
+
+from django.core.management import BaseCommand, CommandError
+
+from ._generate import CATEGORY_NAMES, GENRE_NAMES, Generator
+
+FILENAMES = (
+    'users.csv', 'category.csv', 'genre.csv', 'titles.csv',
+    'genre_title.csv', 'review.csv', 'comments.csv',
+)
+
+DEFAULT_COUNTS = {
+    'users': 1000,
+    'categories': 3,
+    'genres': 10,
+    'titles': 1000,
+    'reviews': 10000,
+    'comments': 30000,
+}
+
+
+class Command(BaseCommand):
+    '''
+    Генерирует csv-файлы в формате load_data в каталог --output-dir.
+
+    Количество строк каждой таблицы задается опциями, распределение
+    отзывов по произведениям и комментариев по отзывам - опцией --skew
+    (показатель закона Ципфа, 0 - равномерное). Одинаковый --seed дает
+    одинаковые файлы. Строки пишутся потоково, так что даже для
+    миллионов отзывов память ограничена.
+    '''
+    help = "Generates synthetic .csv-files for load_data"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output-dir',
+            required=True,
+            help='Directory for the generated csv files',
+        )
+        for name, default in DEFAULT_COUNTS.items():
+            parser.add_argument(
+                f'--{name}',
+                type=int,
+                default=default,
+                help=f'Number of {name} (default {default})',
+            )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed, the same seed produces the same files',
+        )
+        parser.add_argument(
+            '--skew',
+            type=float,
+            default=1.0,
+            help='Zipf exponent of review and comment popularity',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Overwrite existing csv files in the output directory',
+        )
+
+    def handle(self, *args, **options):
+        counts = {name: options[name] for name in DEFAULT_COUNTS}
+        for name, count in counts.items():
+            if count < 0:
+                raise CommandError(f'--{name} must not be negative.')
+        for name, names in (('categories', CATEGORY_NAMES),
+                            ('genres', GENRE_NAMES)):
+            if not 1 <= counts[name] <= len(names):
+                raise CommandError(
+                    f'--{name} must be between 1 and {len(names)}.'
+                )
+        if counts['users'] < 1:
+            raise CommandError('--users must be at least 1.')
+        if options['skew'] < 0:
+            raise CommandError('--skew must not be negative.')
+
+        output_dir = options['output_dir']
+        os.makedirs(output_dir, exist_ok=True)
+        existing = [
+            filename for filename in FILENAMES
+            if os.path.exists(os.path.join(output_dir, filename))
+        ]
+        if existing and not options['force']:
+            raise CommandError(
+                f'{", ".join(existing)} already exist in {output_dir}. '
+                'Use --force to overwrite them.'
+            )
+
+        started = time.monotonic()
+        Generator(
+            output_dir,
+            counts,
+            seed=options['seed'],
+            skew=options['skew'],
+            stdout=self.stdout,
+        ).generate()
+        self.stdout.write(
+            f'Generated in {time.monotonic() - started:.2f}s'
+        )
@@ -2,18 +2,14 @@
 Кастомные менеджмент-команды.
 """
 
-from csv import DictReader
+import time
+
 from django.core.management import BaseCommand
 
-from reviews.models import (
-    Category,
-    Comment,
-    GenreTitle,
-    Genre,
-    Review,
-    Title,
-    User
-)
+from reviews.models import Review, Title
+from reviews.ratings import rebuild_ratings
+
+from ._private import DEFAULT_BATCH_SIZE, TABLES, load_tables
 
 
 ALREDY_LOADED_ERROR_MESSAGE = """
@@ -29,90 +25,58 @@ class Command(BaseCommand):
     '''
     Загружает данные из csv в БД.
     Если данные уже есть в БД, выдаст ошибку ALREDY_LOADED_ERROR_MESSAGE.
+
+    Файлы читаются потоково и вставляются пачками по --batch-size строк,
+    каждая пачка - в своей транзакции. С --jobs N независимые таблицы
+    загружаются параллельно в N потоках, зависимые ждут загрузки таблиц,
+    на которые ссылаются. После загрузки пересчитывается рейтинг
+    произведений, так как bulk_create не вызывает сигналы.
     '''
     help = "Loads data from .csv-files"
 
-    def handle(self, *args, **options):
-
-        models = (
-            Category,
-            Comment,
-            GenreTitle,
-            Genre,
-            Review,
-            Title,
-            User
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Number of rows inserted per transaction',
+        )
+        parser.add_argument(
+            '--data-dir',
+            default=DIR,
+            help='Directory with the csv files',
+        )
+        parser.add_argument(
+            '--jobs',
+            type=int,
+            default=1,
+            help='Number of tables loaded concurrently',
         )
 
-        for model in models:
-            if model.objects.exists():
-                print(f'{model} data already exiting.')
-                print(ALREDY_LOADED_ERROR_MESSAGE)
-                return
-
-        print("Loading data")
-
-        for row in DictReader(open(DIR + 'users.csv')):
-            data = User(
-                id=row['id'],
-                username=row['username'],
-                email=row['email'],
-                role=row['role'],
-                bio=row['bio']
-            )
-            data.save()
+    def handle(self, *args, **options):
 
-        for row in DictReader(open(DIR + 'category.csv')):
-            data = Category(
-                id=row['id'],
-                name=row['name'],
-                slug=row['slug']
-            )
-            data.save()
+        for table in TABLES:
+            if table.model.objects.exists():
+                self.stdout.write(f'{table.model} data already exiting.')
+                self.stdout.write(ALREDY_LOADED_ERROR_MESSAGE)
+                return
 
-        for row in DictReader(open(DIR + 'genre.csv')):
-            data = Genre(
-                id=row['id'],
-                name=row['name'],
-                slug=row['slug']
-            )
-            data.save()
-
-        for row in DictReader(open(DIR + 'titles.csv')):
-            data = Title(
-                id=row['id'],
-                name=row['name'],
-                year=row['year'],
-                description=row['description'],
-                category_id=row['category']
+        self.stdout.write('Loading data')
+
+        started = time.monotonic()
+        for table, loaded, elapsed in load_tables(
+            TABLES,
+            options['data_dir'],
+            batch_size=options['batch_size'],
+            jobs=options['jobs'],
+            stdout=self.stdout,
+        ):
+            self.stdout.write(
+                f'{table.filename}: {loaded} rows in {elapsed:.2f}s '
+                f'({loaded / elapsed if elapsed else loaded:.0f} rows/sec)'
             )
-            data.save()
 
-        for row in DictReader(open(DIR + 'genre_title.csv')):
-            data = GenreTitle(
-                id=row['id'],
-                genre_id=row['genre_id'],
-                title_id=row['title_id']
-            )
-            data.save()
-
-        for row in DictReader(open(DIR + 'review.csv')):
-            data = Review(
-                id=row['id'],
-                title_id=row['title_id'],
-                text=row['text'],
-                author_id=row['author'],
-                score=row['score'],
-                pub_date=row['pub_date']
-            )
-            data.save()
-
-        for row in DictReader(open(DIR + 'comments.csv')):
-            data = Comment(
-                id=row['id'],
-                text=row['text'],
-                pub_date=row['pub_date'],
-                author_id=row['author'],
-                review_id=row['review_id']
-            )
-            data.save()
+        rebuild_ratings(Title, Review)
+        self.stdout.write(
+            f'Loaded in {time.monotonic() - started:.2f}s'
+        )
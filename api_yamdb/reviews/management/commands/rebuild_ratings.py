@@ -0,0 +1,46 @@
+"""
+Пересчет денормализованного рейтинга произведений.
+"""
+
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+
+from reviews.models import Review, Title
+from reviews.ratings import find_inconsistent_ratings, rebuild_ratings
+
+
+class Command(BaseCommand):
+    '''
+    Пересчитывает rating_sum, rating_count и rating всех произведений
+    по таблице отзывов. С флагом --check только проверяет, что
+    сохраненные значения совпадают с фактическими, и завершается
+    с ошибкой при расхождениях.
+    '''
+    help = "Rebuilds or checks stored title ratings"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only report titles with inconsistent ratings',
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            mismatches = find_inconsistent_ratings(Title, Review)
+            for title_id, stored, actual in mismatches:
+                self.stdout.write(
+                    f'Title {title_id}: stored sum/count {stored}, '
+                    f'actual {actual}'
+                )
+            if mismatches:
+                raise CommandError(
+                    f'{len(mismatches)} titles have inconsistent ratings. '
+                    'Run `python manage.py rebuild_ratings` to fix them.'
+                )
+            self.stdout.write('All title ratings are consistent.')
+            return
+
+        with transaction.atomic():
+            updated = rebuild_ratings(Title, Review)
+        self.stdout.write(f'Rebuilt ratings for {updated} titles.')
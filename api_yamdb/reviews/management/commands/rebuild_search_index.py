@@ -0,0 +1,27 @@
+"""
+Перестроение полнотекстового индекса произведений.
+"""
+
+from django.core.management import BaseCommand, CommandError
+
+from reviews.models import Title
+from reviews.search import rebuild_search_index, search_is_supported
+
+
+class Command(BaseCommand):
+    '''
+    Перестраивает индекс FTS5 по name и description всех произведений.
+    Нужен, если произведения менялись в обход триггеров, например
+    после ручного восстановления таблицы reviews_title.
+    '''
+    help = "Rebuilds the full-text search index of titles"
+
+    def handle(self, *args, **options):
+        if not search_is_supported():
+            raise CommandError(
+                'Full-text search index is only available on SQLite.'
+            )
+        rebuild_search_index()
+        self.stdout.write(
+            f'Rebuilt search index for {Title.objects.count()} titles.'
+        )
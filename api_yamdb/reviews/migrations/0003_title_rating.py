@@ -0,0 +1,65 @@
+# Generated by Django 3.2 on 2026-10-16 20:40
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def review_aggregate(Review, aggregate, output_field):
+    return models.Subquery(
+        Review.objects.filter(title=models.OuterRef('pk'))
+        .order_by()
+        .values('title')
+        .annotate(value=aggregate)
+        .values('value'),
+        output_field=output_field,
+    )
+
+
+def fill_ratings(apps, schema_editor):
+    # Пересчет записан здесь, а не импортирован из reviews.ratings, чтобы
+    # изменения кода приложения не меняли историю миграций.
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    Title.objects.update(
+        rating_sum=Coalesce(
+            review_aggregate(
+                Review, models.Sum('score'), models.IntegerField()
+            ),
+            0,
+        ),
+        rating_count=Coalesce(
+            review_aggregate(
+                Review, models.Count('pk'), models.IntegerField()
+            ),
+            0,
+        ),
+        rating=review_aggregate(
+            Review, models.Avg('score'), models.FloatField()
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='rating'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='number of reviews'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='sum of scores'),
+        ),
+        migrations.RunPython(fill_ratings, migrations.RunPython.noop),
+    ]
@@ -42,6 +42,13 @@ class Title(models.Model):
     category - id категории, к которой относится данное произведение;
     genre - id жанра, к которому относится данное произведение;
     description - необязательное поле - подробное описание произведения.
+
+    rating_sum, rating_count и rating - денормализованные сумма оценок,
+    количество отзывов и средняя оценка. Пересчитываются инкрементально
+    при изменении отзывов (см. reviews.signals), полностью - командой
+    rebuild_ratings.
+
+    modified - время последнего сохранения, используется для ETag.
     """
 
     name = models.CharField(
@@ -71,9 +78,38 @@ class Title(models.Model):
         Genre,
         through='genretitle',
     )
+    rating_sum = models.PositiveIntegerField(
+        'sum of scores',
+        default=0,
+        editable=False,
+    )
+    rating_count = models.PositiveIntegerField(
+        'number of reviews',
+        default=0,
+        editable=False,
+    )
+    rating = models.FloatField(
+        'rating',
+        blank=True,
+        null=True,
+        editable=False,
+    )
+    modified = models.DateTimeField(
+        'modified',
+        auto_now=True,
+    )
 
     class Meta:
         ordering = ('name',)
+        # Индексы под фильтры TitleFilter и сортировки списка.
+        indexes = [
+            models.Index(fields=('name',), name='title_name_idx'),
+            models.Index(fields=('year',), name='title_year_idx'),
+            models.Index(fields=('rating',), name='title_rating_idx'),
+            models.Index(
+                fields=('category', 'year',), name='title_category_year_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -83,6 +119,14 @@ class GenreTitle(models.Model):
     title = models.ForeignKey(Title, on_delete=models.CASCADE)
     genre = models.ForeignKey(Genre, on_delete=models.CASCADE)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=('genre', 'title',),
+                name='unique_genre_title',
+            )
+        ]
+
     def __str__(self):
         return f'{self.genre} {self.title}'
 
@@ -127,6 +171,21 @@ class Review(ReviewAndCommentModel):
                 name='unique_review',
             )
         ]
+        indexes = [
+            models.Index(
+                fields=('title', 'pub_date',),
+                name='review_title_pub_date_idx',
+            )
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Запоминаем сохраненные значения, чтобы при обновлении отзыва
+        # пересчитать рейтинг произведения на разницу оценок.
+        instance._loaded_score = instance.__dict__.get('score')
+        instance._loaded_title_id = instance.__dict__.get('title_id')
+        return instance
 
 
 class Comment(ReviewAndCommentModel):
@@ -147,3 +206,11 @@ class Comment(ReviewAndCommentModel):
         User,
         on_delete=models.CASCADE,
         verbose_name='comments')
+
+    class Meta(ReviewAndCommentModel.Meta):
+        indexes = [
+            models.Index(
+                fields=('review', 'pub_date',),
+                name='comment_review_pub_date_idx',
+            )
+        ]
@@ -0,0 +1,106 @@
+"""
+Денормализованный рейтинг произведений.
+
+Title хранит сумму оценок, количество отзывов и среднюю оценку, чтобы
+список произведений не агрегировал таблицу отзывов на каждый запрос.
+"""
+
+from django.db.models import (
+    Avg,
+    Case,
+    Count,
+    F,
+    FloatField,
+    IntegerField,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
+
+
+def _review_aggregate(review_model, aggregate, output_field):
+    """Подзапрос с агрегатом оценок отзывов одного произведения."""
+    return Subquery(
+        review_model.objects.filter(title=OuterRef('pk'))
+        .order_by()
+        .values('title')
+        .annotate(value=aggregate)
+        .values('value'),
+        output_field=output_field,
+    )
+
+
+def apply_score_delta(title_model, title_id, score_delta, count_delta):
+    """
+    Сдвигает сумму оценок и количество отзывов произведения.
+
+    Обновление выполняется одним UPDATE с F-выражениями, поэтому
+    конкурентные изменения отзывов не теряются. Средняя оценка
+    считается в том же запросе из новых значений, там же обновляется
+    modified: update() не выставляет auto_now, а по modified считается
+    ETag произведения.
+    """
+    if not score_delta and not count_delta:
+        return
+    new_sum = F('rating_sum') + score_delta
+    new_count = F('rating_count') + count_delta
+    title_model.objects.filter(pk=title_id).update(
+        rating_sum=new_sum,
+        rating_count=new_count,
+        modified=timezone.now(),
+        rating=Case(
+            When(rating_count__lte=-count_delta, then=Value(None)),
+            default=Cast(new_sum, FloatField()) / new_count,
+            output_field=FloatField(),
+        ),
+    )
+
+
+def rebuild_ratings(title_model, review_model, queryset=None):
+    """
+    Пересчитывает рейтинг с нуля по таблице отзывов.
+
+    Возвращает количество обновленных произведений.
+    """
+    if queryset is None:
+        queryset = title_model.objects.all()
+    return queryset.update(
+        rating_sum=Coalesce(
+            _review_aggregate(review_model, Sum('score'), IntegerField()), 0
+        ),
+        rating_count=Coalesce(
+            _review_aggregate(review_model, Count('pk'), IntegerField()), 0
+        ),
+        rating=_review_aggregate(review_model, Avg('score'), FloatField()),
+    )
+
+
+def find_inconsistent_ratings(title_model, review_model):
+    """
+    Ищет произведения, у которых сохраненный рейтинг расходится
+    с фактическими отзывами.
+
+    Возвращает список кортежей (title_id, сохраненные значения,
+    фактические значения), где значения - (sum, count).
+    """
+    queryset = title_model.objects.order_by('pk').annotate(
+        actual_sum=Coalesce(
+            _review_aggregate(review_model, Sum('score'), IntegerField()), 0
+        ),
+        actual_count=Coalesce(
+            _review_aggregate(review_model, Count('pk'), IntegerField()), 0
+        ),
+    ).exclude(
+        rating_sum=F('actual_sum'), rating_count=F('actual_count'),
+    ).values_list(
+        'pk', 'rating_sum', 'rating_count', 'actual_sum', 'actual_count'
+    )
+    return [
+        (pk, (stored_sum, stored_count), (actual_sum, actual_count))
+        for pk, stored_sum, stored_count, actual_sum, actual_count
+        in queryset.iterator()
+    ]
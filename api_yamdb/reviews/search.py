@@ -0,0 +1,129 @@
+"""
+Полнотекстовый поиск произведений.
+
+В SQLite по name и description произведения строится индекс FTS5
+(таблица TITLE_SEARCH_TABLE, см. миграцию 0006_title_search). Индекс
+хранит только токены и ссылается на строки reviews_title по id, а
+триггеры обновляют его при вставке, изменении названия или описания
+и удалении произведения - в том числе через bulk_create и update().
+
+Миграции, меняющие поля Title (AlterField и т.п.), в SQLite
+пересоздают таблицу reviews_title, и ее триггеры удаляются вместе со
+старой таблицей. Поэтому после каждого migrate ensure_search_index
+(см. ReviewsConfig) создает недостающие триггеры и перестраивает индекс.
+"""
+
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+TITLE_SEARCH_TABLE = 'reviews_title_search'
+
+TRIGGERS = {
+    f'{TITLE_SEARCH_TABLE}_insert': (
+        'AFTER INSERT ON reviews_title BEGIN '
+        f'INSERT INTO {TITLE_SEARCH_TABLE}(rowid, name, description) '
+        'VALUES (new.id, new.name, new.description); END'
+    ),
+    f'{TITLE_SEARCH_TABLE}_delete': (
+        'AFTER DELETE ON reviews_title BEGIN '
+        f'INSERT INTO {TITLE_SEARCH_TABLE}'
+        f'({TITLE_SEARCH_TABLE}, rowid, name, description) '
+        "VALUES ('delete', old.id, old.name, old.description); END"
+    ),
+    # Только при изменении индексируемых полей: рейтинг произведения
+    # обновляется на каждый отзыв и переиндексации не требует.
+    f'{TITLE_SEARCH_TABLE}_update': (
+        'AFTER UPDATE OF name, description ON reviews_title BEGIN '
+        f'INSERT INTO {TITLE_SEARCH_TABLE}'
+        f'({TITLE_SEARCH_TABLE}, rowid, name, description) '
+        "VALUES ('delete', old.id, old.name, old.description); "
+        f'INSERT INTO {TITLE_SEARCH_TABLE}(rowid, name, description) '
+        'VALUES (new.id, new.name, new.description); END'
+    ),
+}
+
+
+def search_is_supported(db_connection=connection):
+    return db_connection.vendor == 'sqlite'
+
+
+def build_match_query(text):
+    """
+    Собирает выражение MATCH из пользовательского ввода.
+
+    Каждое слово берется в кавычки, чтобы символы синтаксиса FTS5 не
+    интерпретировались, и ищется по префиксу. Все слова обязательны.
+    Возвращает None, если в тексте нет ни одного слова.
+    """
+    words = re.findall(r'\w+', text)
+    if not words:
+        return None
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def search_titles(queryset, text):
+    """
+    Оставляет в queryset произведения, подходящие под text, и
+    сортирует их по релевантности (bm25).
+
+    На базах без FTS5 ищет вхождение всех слов в name или description.
+    """
+    if not search_is_supported():
+        for word in re.findall(r'\w+', text):
+            queryset = queryset.filter(
+                Q(name__icontains=word) | Q(description__icontains=word)
+            )
+        return queryset
+
+    match = build_match_query(text)
+    if match is None:
+        return queryset.none()
+    table = TITLE_SEARCH_TABLE
+    title_table = queryset.model._meta.db_table
+    # MATCH выполняется один раз: индекс присоединяется к произведениям
+    # по rowid, и rank берется из той же строки индекса.
+    return queryset.extra(
+        tables=[table],
+        where=[f'{table}.rowid = {title_table}.id', f'{table} MATCH %s'],
+        params=[match],
+        select={'search_rank': f'{table}.rank'},
+    ).order_by('search_rank', 'pk')
+
+
+def rebuild_search_index():
+    """Перестраивает индекс по текущему содержимому reviews_title."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {TITLE_SEARCH_TABLE}({TITLE_SEARCH_TABLE}) "
+            "VALUES ('rebuild')"
+        )
+
+
+def ensure_search_index(db_connection=connection):
+    """
+    Создает недостающие триггеры индекса и, если их не было,
+    перестраивает индекс. Ничего не делает, пока индекс не создан
+    миграцией 0006_title_search.
+    """
+    if not search_is_supported(db_connection):
+        return
+    with db_connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT type, name FROM sqlite_master "
+            "WHERE name = %s OR (type = 'trigger' AND tbl_name = %s)",
+            (TITLE_SEARCH_TABLE, 'reviews_title'),
+        )
+        existing = {name for _, name in cursor.fetchall()}
+        if TITLE_SEARCH_TABLE not in existing:
+            return
+        missing = [name for name in TRIGGERS if name not in existing]
+        if not missing:
+            return
+        for name in missing:
+            cursor.execute(f'CREATE TRIGGER {name} {TRIGGERS[name]}')
+        cursor.execute(
+            f"INSERT INTO {TITLE_SEARCH_TABLE}({TITLE_SEARCH_TABLE}) "
+            "VALUES ('rebuild')"
+        )
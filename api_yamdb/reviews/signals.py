@@ -0,0 +1,48 @@
+"""
+Сигналы приложения reviews.
+
+Поддерживают денормализованный рейтинг произведения в актуальном
+состоянии при создании, изменении и удалении отзывов.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Review, Title
+from .ratings import apply_score_delta, rebuild_ratings
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, raw=False, **kwargs):
+    """Учитывает новый отзыв или изменение оценки в рейтинге."""
+    if raw:
+        return
+    score = int(instance.score)
+    if created:
+        apply_score_delta(Title, instance.title_id, score, 1)
+    else:
+        loaded_score = getattr(instance, '_loaded_score', None)
+        loaded_title_id = getattr(instance, '_loaded_title_id', None)
+        if loaded_score is None or loaded_title_id is None:
+            # Исходная оценка неизвестна - пересчитываем произведение.
+            rebuild_ratings(
+                Title, Review, Title.objects.filter(pk=instance.title_id)
+            )
+        elif loaded_title_id != instance.title_id:
+            apply_score_delta(Title, loaded_title_id, -loaded_score, -1)
+            apply_score_delta(Title, instance.title_id, score, 1)
+        else:
+            apply_score_delta(
+                Title, instance.title_id, score - loaded_score, 0
+            )
+    instance._loaded_score = score
+    instance._loaded_title_id = instance.title_id
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    """Исключает удаленный отзыв из рейтинга."""
+    score = getattr(instance, '_loaded_score', None)
+    if score is None:
+        score = int(instance.score)
+    apply_score_delta(Title, instance.title_id, -score, -1)
@@ -0,0 +1,69 @@
+"""
+Отправка писем из очереди.
+"""
+
+import time
+
+from django.core.management import BaseCommand
+
+from users.outbox import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_MAX_ATTEMPTS,
+    deliver_outbox,
+)
+
+
+class Command(BaseCommand):
+    '''
+    Отправляет письма, сохраненные в OutboxMessage.
+
+    Без --loop отправляет все письма, которые пора отправить, и
+    завершается. С --loop работает постоянно, проверяя очередь раз в
+    --interval секунд. Письма, не отправленные за --max-attempts
+    попыток, остаются в таблице с текстом последней ошибки.
+    '''
+    help = "Delivers queued emails"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Number of emails sent over one connection',
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=DEFAULT_MAX_ATTEMPTS,
+            help='Number of attempts before an email is given up',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling the outbox',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Seconds between polls in --loop mode',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            total_sent = total_failed = 0
+            while True:
+                sent, failed = deliver_outbox(
+                    options['batch_size'], options['max_attempts']
+                )
+                total_sent += sent
+                total_failed += failed
+                if sent + failed < options['batch_size'] or not sent:
+                    break
+            if total_sent or total_failed:
+                self.stdout.write(
+                    f'Sent {total_sent} emails, {total_failed} failed.'
+                )
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
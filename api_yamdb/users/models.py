@@ -1,6 +1,7 @@
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 
 
 from django.contrib.auth.validators import UnicodeUsernameValidator
@@ -82,3 +83,72 @@ class User(AbstractUser):
 
     def __str__(self):
         return f'{self.username} {self.email} {self.role}'
+
+
+class OutboxMessage(models.Model):
+    """
+    Модель исходящего письма.
+
+    Письма не отправляются в обработчике запроса, а сохраняются в эту
+    таблицу и доставляются командой send_outbox.
+
+    attempts - количество неудачных попыток отправки;
+    next_attempt - время, раньше которого письмо не отправляется;
+    sent - время отправки, пустое для недоставленных писем;
+    last_error - текст последней ошибки отправки;
+    claim - метка пачки, захваченной для отправки (см. users.outbox).
+    """
+
+    subject = models.CharField(
+        'subject',
+        max_length=settings.LENG_MAX,
+    )
+    body = models.TextField(
+        'body',
+    )
+    from_email = models.EmailField(
+        'from',
+        max_length=settings.LENG_EMAIL,
+    )
+    to = models.EmailField(
+        'to',
+        max_length=settings.LENG_EMAIL,
+    )
+    created = models.DateTimeField(
+        'created',
+        auto_now_add=True,
+    )
+    attempts = models.PositiveSmallIntegerField(
+        'attempts',
+        default=0,
+    )
+    next_attempt = models.DateTimeField(
+        'next attempt',
+        default=timezone.now,
+    )
+    sent = models.DateTimeField(
+        'sent',
+        blank=True,
+        null=True,
+    )
+    last_error = models.TextField(
+        'last error',
+        blank=True,
+    )
+    claim = models.CharField(
+        'claim',
+        max_length=32,
+        blank=True,
+    )
+
+    class Meta:
+        ordering = ('id',)
+        indexes = [
+            models.Index(
+                fields=('sent', 'next_attempt',),
+                name='outbox_pending_idx',
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.to} {self.subject}'
@@ -0,0 +1,129 @@
+"""
+Очередь исходящих писем.
+
+enqueue_mail сохраняет письмо в таблицу OutboxMessage одним INSERT,
+deliver_outbox отправляет накопившиеся письма пачками через одно
+соединение с почтовым сервером. Неудачные письма повторяются с
+экспоненциально растущей паузой.
+
+Перед отправкой пачка захватывается одним условным UPDATE: письмам
+ставится метка claim и next_attempt сдвигается на CLAIM_TIMEOUT, так
+что несколько воркеров send_outbox не отправят одно письмо дважды.
+Если воркер завершится, не отправив пачку, письма снова станут
+доступны через CLAIM_TIMEOUT.
+"""
+
+import uuid
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from .models import OutboxMessage
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_MAX_ATTEMPTS = 5
+RETRY_BASE_DELAY = timedelta(minutes=1)
+RETRY_MAX_DELAY = timedelta(hours=1)
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+
+def enqueue_mail(subject, body, from_email, to):
+    """Ставит письмо в очередь на отправку."""
+    return OutboxMessage.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email,
+        to=to,
+    )
+
+
+def retry_delay(attempts):
+    """Пауза перед следующей попыткой после attempts неудачных."""
+    return min(RETRY_BASE_DELAY * 2 ** (attempts - 1), RETRY_MAX_DELAY)
+
+
+def pending_messages(max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """Письма, которые пора отправить."""
+    return OutboxMessage.objects.filter(
+        sent__isnull=True,
+        next_attempt__lte=timezone.now(),
+        attempts__lt=max_attempts,
+    )
+
+
+def claim_messages(batch_size=DEFAULT_BATCH_SIZE,
+                   max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """
+    Захватывает до batch_size писем для отправки этим воркером.
+
+    UPDATE повторяет условия pending_messages, поэтому письма, которые
+    другой воркер захватил между выборкой id и обновлением, не попадут
+    в пачку.
+    """
+    ids = list(
+        pending_messages(max_attempts).values_list('pk', flat=True)[
+            :batch_size
+        ]
+    )
+    if not ids:
+        return []
+    claim = uuid.uuid4().hex
+    pending_messages(max_attempts).filter(pk__in=ids).update(
+        claim=claim, next_attempt=timezone.now() + CLAIM_TIMEOUT
+    )
+    return list(OutboxMessage.objects.filter(claim=claim, sent__isnull=True))
+
+
+def mark_failed(message, error):
+    """Откладывает письмо до следующей попытки."""
+    message.attempts += 1
+    message.next_attempt = timezone.now() + retry_delay(message.attempts)
+    message.last_error = str(error)
+    message.save(update_fields=('attempts', 'next_attempt', 'last_error'))
+
+
+def deliver_outbox(batch_size=DEFAULT_BATCH_SIZE,
+                   max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """
+    Отправляет одну пачку писем из очереди.
+
+    Все письма пачки отправляются через одно соединение. Если
+    соединение не открылось, неудачной попыткой считается отправка
+    всей пачки. Возвращает количество отправленных и неотправленных
+    писем.
+    """
+    messages = claim_messages(batch_size, max_attempts)
+    if not messages:
+        return 0, 0
+
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as error:
+        for message in messages:
+            mark_failed(message, error)
+        return 0, len(messages)
+
+    sent = failed = 0
+    try:
+        for message in messages:
+            email = EmailMessage(
+                message.subject,
+                message.body,
+                message.from_email,
+                [message.to],
+                connection=connection,
+            )
+            try:
+                email.send()
+            except Exception as error:
+                mark_failed(message, error)
+                failed += 1
+            else:
+                message.sent = timezone.now()
+                message.save(update_fields=('sent',))
+                sent += 1
+    finally:
+        connection.close()
+    return sent, failed
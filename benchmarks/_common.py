@@ -0,0 +1,115 @@
+"""
+Общие функции бенчмарков.
+
+Бенчмарки запускаются из корня репозитория без сервера: Django
+настраивается на отдельную файловую базу SQLite во временном каталоге,
+запросы выполняются через django.test.Client.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+PROJECT_DIR = REPO_DIR / 'api_yamdb'
+
+
+def setup_django(db_path=None, migrate=True, **overrides):
+    """
+    Настраивает Django на базу db_path (по умолчанию - временный файл)
+    и применяет миграции. Возвращает путь к базе.
+
+    overrides заменяют одноименные настройки проекта.
+    """
+    sys.path.insert(0, str(PROJECT_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    os.environ.setdefault('SECRET_KEY', 'benchmark')
+    if db_path is None:
+        db_path = os.path.join(tempfile.mkdtemp(), 'benchmark.sqlite3')
+
+    import django
+    from django.conf import settings
+
+    settings.DATABASES['default']['NAME'] = db_path
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = ['*']
+    settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    django.setup()
+
+    if migrate:
+        from django.core.management import call_command
+        call_command('migrate', verbosity=0)
+    return db_path
+
+
+def run_concurrently(worker, workers, iterations):
+    """
+    Вызывает worker(index) iterations раз в workers потоках.
+
+    Возвращает список длительностей вызовов в секундах и общее время.
+    """
+    from django.db import connection
+
+    durations = []
+    lock = threading.Lock()
+    counter = iter(range(iterations))
+
+    def run():
+        try:
+            while True:
+                with lock:
+                    index = next(counter, None)
+                if index is None:
+                    return
+                started = time.perf_counter()
+                worker(index)
+                elapsed = time.perf_counter() - started
+                with lock:
+                    durations.append(elapsed)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=run) for _ in range(workers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return durations, time.perf_counter() - started
+
+
+def percentile(values, fraction):
+    """Перцентиль по ближайшему рангу."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(durations, elapsed):
+    """Перцентили времени ответа в миллисекундах и запросы в секунду."""
+    return {
+        'requests': len(durations),
+        'rps': round(len(durations) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(durations, 0.5) * 1000, 3),
+        'p95_ms': round(percentile(durations, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(durations, 0.99) * 1000, 3),
+    }
+
+
+def git_commit():
+    """Текущий коммит репозитория или None вне git."""
+    try:
+        return subprocess.run(
+            ('git', 'rev-parse', '--short', 'HEAD'),
+            cwd=REPO_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
@@ -0,0 +1,301 @@
+"""
+Бенчмарк публичных эндпоинтов API.
+
+Генерирует набор данных командой generate_data (или берет готовые
+csv из --data-dir), загружает его командой load_data во временную базу
+и прогоняет каждый эндпоинт через django.test.Client в --workers
+потоках. Для каждого эндпоинта выводит запросы в секунду, перцентили
+времени ответа и среднее число SQL-запросов, а результаты сохраняет в
+JSON для сравнения запусков (см. benchmarks/compare.py).
+
+    python benchmarks/bench_api.py --size medium --requests 500
+    python benchmarks/bench_api.py --only titles_list reviews_list
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from io import StringIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._common import (  # noqa: E402
+    REPO_DIR,
+    git_commit,
+    run_concurrently,
+    setup_django,
+    summarize,
+)
+
+SIZES = {
+    'small': {
+        'users': 1000, 'titles': 1000, 'reviews': 10000, 'comments': 20000,
+    },
+    'medium': {
+        'users': 10000, 'titles': 10000, 'reviews': 200000,
+        'comments': 400000,
+    },
+    'large': {
+        'users': 100000, 'titles': 100000, 'reviews': 2000000,
+        'comments': 5000000,
+    },
+}
+
+RESULTS_DIR = REPO_DIR / 'benchmarks' / 'results'
+
+# name - имя в отчете; request(client, index) - выполняет запрос;
+# status - ожидаемый код ответа; auth - нужен ли токен пользователя.
+Endpoint = namedtuple('Endpoint', ('name', 'request', 'status', 'auth'))
+
+
+def prepare_data(args):
+    """
+    Генерирует csv при необходимости и загружает их в базу.
+    Возвращает каталог с csv и время загрузки.
+    """
+    from django.core.management import call_command
+
+    data_dir = args.data_dir
+    if data_dir is None:
+        data_dir = tempfile.mkdtemp()
+        counts = SIZES[args.size]
+        call_command(
+            'generate_data', '--output-dir', data_dir, '--seed',
+            str(args.seed), *(
+                f'--{name}={count}' for name, count in counts.items()
+            ),
+            stdout=StringIO(),
+        )
+    started = time.perf_counter()
+    call_command(
+        'load_data', '--data-dir', data_dir, '--jobs', '3', stdout=StringIO()
+    )
+    return data_dir, time.perf_counter() - started
+
+
+def build_endpoints(rng):
+    """Эндпоинты и заранее выбранные для них параметры запросов."""
+    from django.contrib.auth.tokens import default_token_generator
+
+    from reviews.models import Category, Genre, Review, Title
+    from users.models import User
+
+    title_ids = list(Title.objects.values_list('pk', flat=True)[:5000])
+    reviewed = list(
+        Review.objects.order_by('?').values_list('title_id', 'pk')[:1000]
+    )
+    genres = list(Genre.objects.values_list('slug', flat=True))
+    categories = list(Category.objects.values_list('slug', flat=True))
+    words = [
+        name.split()[-1]
+        for name in Title.objects.values_list('name', flat=True)[:200]
+    ]
+    token_users = [
+        (user.username, default_token_generator.make_token(user))
+        for user in User.objects.order_by('pk')[:200]
+    ]
+    run_id = int(time.time())
+    offset = rng.randrange(1_000_000)
+
+    def choice(values, index):
+        return values[(index * 7919 + offset) % len(values)]
+
+    return (
+        Endpoint('titles_list', lambda client, index: client.get(
+            '/api/v1/titles/', {'page': index % 20 + 1}
+        ), 200, False),
+        Endpoint('titles_filter', lambda client, index: client.get(
+            '/api/v1/titles/', {
+                'genre': choice(genres, index),
+                'category': choice(categories, index),
+            }
+        ), 200, False),
+        Endpoint('titles_search', lambda client, index: client.get(
+            '/api/v1/titles/', {'search': choice(words, index)}
+        ), 200, False),
+        Endpoint('title_detail', lambda client, index: client.get(
+            f'/api/v1/titles/{choice(title_ids, index)}/'
+        ), 200, False),
+        Endpoint('reviews_list', lambda client, index: client.get(
+            f'/api/v1/titles/{choice(reviewed, index)[0]}/reviews/'
+        ), 200, False),
+        Endpoint('review_detail', lambda client, index: client.get(
+            '/api/v1/titles/{}/reviews/{}/'.format(*choice(reviewed, index))
+        ), 200, False),
+        Endpoint('comments_list', lambda client, index: client.get(
+            '/api/v1/titles/{}/reviews/{}/comments/'.format(
+                *choice(reviewed, index)
+            )
+        ), 200, False),
+        Endpoint('comment_create', lambda client, index: client.post(
+            '/api/v1/titles/{}/reviews/{}/comments/'.format(
+                *choice(reviewed, index)
+            ),
+            {'text': 'Комментарий из бенчмарка'},
+        ), 201, True),
+        Endpoint('signup', lambda client, index: client.post(
+            '/api/v1/auth/signup/', {
+                'username': f'bench{run_id}_{index}',
+                'email': f'bench{run_id}_{index}@yamdb.fake',
+            }
+        ), 200, False),
+        Endpoint('token', lambda client, index: client.post(
+            '/api/v1/auth/token/', dict(zip(
+                ('username', 'confirmation_code'), choice(token_users, index)
+            ))
+        ), 200, False),
+    )
+
+
+class EndpointRun:
+    """
+    Вызов эндпоинта из рабочего потока бенчмарка.
+
+    У каждого потока свой клиент; число SQL-запросов и ошибки
+    собираются для отчета.
+    """
+
+    def __init__(self, endpoint, token, offset):
+        self.endpoint = endpoint
+        self.token = token
+        self.offset = offset
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.errors = []
+        self.query_counts = []
+
+    def client(self):
+        from rest_framework.test import APIClient
+
+        if not hasattr(self.local, 'client'):
+            self.local.client = APIClient()
+            if self.endpoint.auth:
+                self.local.client.credentials(
+                    HTTP_AUTHORIZATION=f'Bearer {self.token}'
+                )
+        return self.local.client
+
+    def count_query(self, execute, sql, params, many, context):
+        self.local.queries += 1
+        return execute(sql, params, many, context)
+
+    def __call__(self, index):
+        from django.db import connection
+
+        self.local.queries = 0
+        try:
+            with connection.execute_wrapper(self.count_query):
+                response = self.endpoint.request(
+                    self.client(), index + self.offset
+                )
+            if response.status_code != self.endpoint.status:
+                raise AssertionError(
+                    f'status {response.status_code}, '
+                    f'expected {self.endpoint.status}'
+                )
+        except Exception as error:
+            with self.lock:
+                self.errors.append(repr(error))
+        with self.lock:
+            self.query_counts.append(self.local.queries)
+
+
+def run_endpoint(endpoint, args, token):
+    """Прогоняет эндпоинт, возвращает сводку для отчета."""
+    from django.db import connection
+
+    warmup = EndpointRun(endpoint, token, offset=0)
+    for index in range(args.warmup):
+        warmup(index)
+    connection.close()
+
+    run = EndpointRun(endpoint, token, offset=args.warmup)
+    durations, elapsed = run_concurrently(run, args.workers, args.requests)
+    result = summarize(durations, elapsed)
+    result['queries_per_request'] = round(
+        sum(run.query_counts) / max(1, len(run.query_counts)), 2
+    )
+    result['errors'] = len(run.errors)
+    if run.errors:
+        result['first_error'] = run.errors[0]
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--size', choices=SIZES, default='small')
+    parser.add_argument(
+        '--data-dir', help='Use existing csv files instead of generating'
+    )
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--only', nargs='*', help='Endpoint names to run')
+    parser.add_argument(
+        '--output', help=f'JSON file for results (default: {RESULTS_DIR})'
+    )
+    args = parser.parse_args()
+
+    setup_django()
+
+    from api.authentication import access_token_for_user
+    from users.models import User
+
+    _, load_time = prepare_data(args)
+    endpoints = build_endpoints(random.Random(args.seed))
+    if args.only:
+        endpoints = [
+            endpoint for endpoint in endpoints if endpoint.name in args.only
+        ]
+    token = str(access_token_for_user(User.objects.order_by('pk').first()))
+
+    results = {}
+    print(
+        f'{"endpoint":<16}{"rps":>9}{"p50 ms":>10}{"p95 ms":>10}'
+        f'{"p99 ms":>10}{"queries":>9}{"errors":>8}'
+    )
+    for endpoint in endpoints:
+        result = run_endpoint(endpoint, args, token)
+        results[endpoint.name] = result
+        print(
+            f'{endpoint.name:<16}{result["rps"]:>9.1f}'
+            f'{result["p50_ms"]:>10.2f}{result["p95_ms"]:>10.2f}'
+            f'{result["p99_ms"]:>10.2f}'
+            f'{result["queries_per_request"]:>9.1f}{result["errors"]:>8}'
+        )
+
+    commit = git_commit()
+    report = {
+        'commit': commit,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'params': {
+            'size': None if args.data_dir else args.size,
+            'data_dir': args.data_dir,
+            'seed': args.seed,
+            'requests': args.requests,
+            'warmup': args.warmup,
+            'workers': args.workers,
+        },
+        'load_data_seconds': round(load_time, 2),
+        'endpoints': results,
+    }
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = RESULTS_DIR / (
+            f'{time.strftime("%Y%m%d-%H%M%S")}-{commit or "nogit"}.json'
+        )
+    with open(output, 'w', encoding='utf-8') as report_file:
+        json.dump(report, report_file, indent=2, ensure_ascii=False)
+    print(f'Results saved to {output}')
+
+
+if __name__ == '__main__':
+    main()
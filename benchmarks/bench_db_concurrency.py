@@ -0,0 +1,119 @@
+"""
+Бенчмарк смешанной нагрузки чтения и записи на SQLite.
+
+Запускает --requests запросов в --workers потоках: доля --write-share
+создает комментарии к отзыву, остальные читают /api/v1/titles/.
+Выводит запросы в секунду, перцентили времени ответа и количество
+ошибок (в том числе "database is locked"). С --no-tuning соединения
+открываются без SQLITE_PRAGMAS и не переиспользуются (CONN_MAX_AGE=0).
+
+    python benchmarks/bench_db_concurrency.py --workers 8 --requests 2000
+    python benchmarks/bench_db_concurrency.py --workers 8 --no-tuning
+"""
+
+import argparse
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._common import (  # noqa: E402
+    percentile,
+    run_concurrently,
+    setup_django,
+)
+
+
+def create_data(titles, writers):
+    """Создает произведения, отзыв и пишущих пользователей."""
+    from reviews.models import Category, Review, Title
+    from users.models import User
+
+    category = Category.objects.create(name='Фильмы', slug='films')
+    Title.objects.bulk_create(
+        Title(name=f'Произведение {index}', year=2000, category=category)
+        for index in range(titles)
+    )
+    User.objects.bulk_create(
+        User(username=f'writer{index}', email=f'writer{index}@yamdb.fake')
+        for index in range(writers)
+    )
+    users = list(User.objects.filter(username__startswith='writer'))
+    review = Review.objects.create(
+        title=Title.objects.first(), author=users[0], text='Отзыв', score=5,
+    )
+    return users, review
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--write-share', type=float, default=0.2)
+    parser.add_argument('--titles', type=int, default=100)
+    parser.add_argument('--no-tuning', action='store_true')
+    args = parser.parse_args()
+
+    overrides = {}
+    if args.no_tuning:
+        overrides['SQLITE_PRAGMAS'] = {}
+    setup_django(**overrides)
+
+    from django.conf import settings
+    from django.db import connection
+    from rest_framework.test import APIClient
+
+    from api.authentication import access_token_for_user
+
+    if args.no_tuning:
+        settings.DATABASES['default']['CONN_MAX_AGE'] = 0
+        connection.settings_dict['CONN_MAX_AGE'] = 0
+
+    users, review = create_data(args.titles, args.workers)
+    connection.close()
+    tokens = [str(access_token_for_user(user)) for user in users]
+    comments_url = (
+        f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/comments/'
+    )
+    every = max(1, round(1 / args.write_share)) if args.write_share else 0
+    errors = []
+    lock = threading.Lock()
+
+    def request(index):
+        client = APIClient()
+        try:
+            if every and index % every == 0:
+                client.credentials(
+                    HTTP_AUTHORIZATION=f'Bearer {tokens[index % len(tokens)]}'
+                )
+                response = client.post(comments_url, data={'text': 'Текст'})
+                expected = 201
+            else:
+                response = client.get('/api/v1/titles/')
+                expected = 200
+            if response.status_code != expected:
+                raise AssertionError(response.status_code)
+        except Exception as error:
+            with lock:
+                errors.append(error)
+
+    durations, elapsed = run_concurrently(
+        request, args.workers, args.requests
+    )
+    locked = sum('locked' in str(error) for error in errors)
+    print(f'tuning:                {"off" if args.no_tuning else "on"}')
+    print(f'workers:               {args.workers}')
+    print(f'requests:              {len(durations)}')
+    print(f'requests/sec:          {len(durations) / elapsed:.1f}')
+    for fraction in (0.5, 0.95, 0.99):
+        print(
+            f'p{int(fraction * 100)} latency, ms:       '
+            f'{percentile(durations, fraction) * 1000:.2f}'
+        )
+    print(f'errors:                {len(errors)}')
+    print(f'"database is locked":  {locked}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Бенчмарк регистрации пользователей.
+
+Запускает --signups регистраций в --workers потоках через
+/api/v1/auth/signup/ и выводит количество регистраций в секунду,
+перцентили времени ответа и число SQL-запросов на одну регистрацию.
+
+    python benchmarks/bench_signup.py --workers 4 --signups 2000
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._common import (  # noqa: E402
+    percentile,
+    run_concurrently,
+    setup_django,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--signups', type=int, default=1000)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+
+    url = '/api/v1/auth/signup/'
+
+    def signup(index):
+        response = Client().post(url, data={
+            'username': f'user{index}',
+            'email': f'user{index}@yamdb.fake',
+        })
+        assert response.status_code == 200, response.content
+
+    with CaptureQueriesContext(connection) as new_user:
+        signup(-1)
+    with CaptureQueriesContext(connection) as repeated:
+        signup(-1)
+
+    durations, elapsed = run_concurrently(signup, args.workers, args.signups)
+    print(f'workers:               {args.workers}')
+    print(f'signups:               {len(durations)}')
+    print(f'signups/sec:           {len(durations) / elapsed:.1f}')
+    for fraction in (0.5, 0.95, 0.99):
+        print(
+            f'p{int(fraction * 100)} latency, ms:       '
+            f'{percentile(durations, fraction) * 1000:.2f}'
+        )
+    print(f'queries (new user):    {len(new_user)}')
+    print(f'queries (repeated):    {len(repeated)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Бенчмарк индекса подсказок по префиксу.
+
+Строит PrefixIndex из --names случайных названий и выводит время
+построения и перцентили времени поиска по --queries префиксам.
+
+    python benchmarks/bench_suggest.py --names 200000
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._common import percentile, setup_django  # noqa: E402
+
+
+def random_name(rng):
+    return ' '.join(
+        ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9)))
+        for _ in range(rng.randint(1, 4))
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--names', type=int, default=200000)
+    parser.add_argument('--queries', type=int, default=10000)
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    setup_django(migrate=False)
+
+    from api.suggest import PrefixIndex
+
+    rng = random.Random(args.seed)
+    names = [random_name(rng) for _ in range(args.names)]
+    started = time.perf_counter()
+    index = PrefixIndex((pk, name, name) for pk, name in enumerate(names))
+    built = time.perf_counter() - started
+    started = time.perf_counter()
+    for pk in range(1000):
+        index.add(pk, names[pk].upper(), names[pk])
+    added = (time.perf_counter() - started) / 1000
+
+    durations = []
+    for _ in range(args.queries):
+        name = rng.choice(names)
+        prefix = name[:rng.randint(1, 4)]
+        started = time.perf_counter()
+        index.search(prefix, args.limit)
+        durations.append(time.perf_counter() - started)
+
+    print(f'names:                 {args.names}')
+    print(f'build, s:              {built:.2f}')
+    print(f'add, ms:               {added * 1000:.3f}')
+    for fraction in (0.5, 0.95, 0.99):
+        print(
+            f'p{int(fraction * 100)} search, ms:        '
+            f'{percentile(durations, fraction) * 1000:.3f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Сравнение двух отчетов bench_api.py.
+
+Для каждого эндпоинта выводит значения из обоих отчетов и изменение
+в процентах. Рост времени ответа или числа запросов больше
+--threshold процентов помечается как регрессия; с --fail скрипт в
+этом случае завершается с кодом 1.
+
+    python benchmarks/compare.py benchmarks/results/old.json \\
+        benchmarks/results/new.json
+"""
+
+import argparse
+import json
+import sys
+
+# Метрика и направление: 1 - чем больше, тем хуже, -1 - наоборот.
+METRICS = (
+    ('rps', -1),
+    ('p50_ms', 1),
+    ('p95_ms', 1),
+    ('p99_ms', 1),
+    ('queries_per_request', 1),
+)
+
+
+def load(path):
+    with open(path, encoding='utf-8') as report_file:
+        return json.load(report_file)
+
+
+def change(old, new):
+    if not old:
+        return 0.0 if not new else float('inf')
+    return (new - old) / old * 100
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('old')
+    parser.add_argument('new')
+    parser.add_argument('--threshold', type=float, default=10.0)
+    parser.add_argument('--fail', action='store_true')
+    args = parser.parse_args()
+
+    old, new = load(args.old), load(args.new)
+    print(f'old: {old.get("commit")} {old.get("created")}')
+    print(f'new: {new.get("commit")} {new.get("created")}')
+    if old.get('params') != new.get('params'):
+        print('warning: runs used different parameters')
+
+    regressions = []
+    for name, new_result in new['endpoints'].items():
+        old_result = old['endpoints'].get(name)
+        if old_result is None:
+            print(f'\n{name}: only in new report')
+            continue
+        print(f'\n{name}')
+        for metric, direction in METRICS:
+            before, after = old_result[metric], new_result[metric]
+            delta = change(before, after)
+            marker = ''
+            if delta * direction > args.threshold:
+                marker = '  REGRESSION'
+                regressions.append(f'{name}.{metric}')
+            print(
+                f'  {metric:<20}{before:>10.2f}{after:>10.2f}'
+                f'{delta:>+9.1f}%{marker}'
+            )
+
+    if regressions:
+        print(f'\n{len(regressions)} regressions: {", ".join(regressions)}')
+        if args.fail:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,16 @@
+import pytest
+from django.core.cache import cache
+
+from api.authentication import forget_all_users
+from api.suggest import forget_suggestions
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    forget_all_users()
+    forget_suggestions()
+    yield
+    cache.clear()
+    forget_all_users()
+    forget_suggestions()
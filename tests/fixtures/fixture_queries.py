@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture
+def nplusone(settings):
+    """Запросы с N+1 запросами к БД завершаются NPlusOneError."""
+    settings.NPLUSONE = 'raise'
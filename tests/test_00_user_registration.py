@@ -2,6 +2,7 @@ from http import HTTPStatus
 
 import pytest
 from django.core import mail
+from django.core.management import call_command
 from django.db.utils import IntegrityError
 
 from tests.utils import (invalid_data_for_user_patch_and_creation,
@@ -110,6 +111,7 @@ class Test00UserRegistration:
         }
 
         response = client.post(self.url_signup, data=valid_data)
+        call_command('send_outbox')  # письма отправляются из очереди
         outbox_after = mail.outbox  # email outbox after user create
 
         assert response.status_code != HTTPStatus.NOT_FOUND, (
@@ -373,3 +375,18 @@ class Test00UserRegistration:
             'пользователя, созданного администратором,  возвращает ответ '
             'со статусом 200.'
         )
+
+    def test_signup_query_count(self, client, django_assert_num_queries):
+        valid_data = {
+            'email': 'test_email@yamdb.fake',
+            'username': 'valid_username_1'
+        }
+        # Поиск пользователя, вставка пользователя, вставка письма.
+        with django_assert_num_queries(3):
+            response = client.post(self.url_signup, data=valid_data)
+        assert response.status_code == HTTPStatus.OK
+
+        # Поиск пользователя, вставка письма.
+        with django_assert_num_queries(2):
+            response = client.post(self.url_signup, data=valid_data)
+        assert response.status_code == HTTPStatus.OK
@@ -139,3 +139,31 @@ class Test02CategoryAPI:
                           HTTPStatus.FORBIDDEN)
         check_permissions(moderator_client, url, data, 'модератора',
                           categories, HTTPStatus.FORBIDDEN)
+
+    def test_06_category_list_cache(self, client, admin_client,
+                                    django_assert_num_queries):
+        create_categories(admin_client)
+        url = '/api/v1/categories/'
+        expected = client.get(url).json()
+        with django_assert_num_queries(0):
+            response = client.get(url)
+        assert response.json() == expected, (
+            f'Проверьте, что повторный GET-запрос к `{url}` отдает '
+            'закэшированный список категорий без обращения к БД.'
+        )
+
+        search = client.get(url, {'search': 'Книги'}).json()
+        assert search['count'] == 1, (
+            f'Проверьте, что кэш ответа `{url}` учитывает параметры запроса.'
+        )
+
+        admin_client.post(url, data={'name': 'Музыка', 'slug': 'music'})
+        assert client.get(url).json()['count'] == 3, (
+            f'Проверьте, что после создания категории кэш ответа `{url}` '
+            'сбрасывается.'
+        )
+        admin_client.delete(f'{url}music/')
+        assert client.get(url).json() == expected, (
+            f'Проверьте, что после удаления категории кэш ответа `{url}` '
+            'сбрасывается.'
+        )
@@ -1,6 +1,7 @@
 from http import HTTPStatus
 
 import pytest
+from reviews.models import Genre
 
 from tests.utils import (check_name_and_slug_patterns, check_pagination,
                          check_permissions, create_genre)
@@ -122,3 +123,33 @@ class Test03GenreAPI:
                           HTTPStatus.FORBIDDEN)
         check_permissions(moderator_client, url, data, 'модератора',
                           genres, HTTPStatus.FORBIDDEN)
+
+    def test_06_genre_list_cache(self, client, admin_client,
+                                 django_assert_num_queries):
+        genres = create_genre(admin_client)
+        url = '/api/v1/genres/'
+        client.get(url)
+        with django_assert_num_queries(0):
+            assert client.get(url).json()['count'] == len(genres)
+
+        admin_client.delete(f'{url}{genres[0]["slug"]}/')
+        assert client.get(url).json()['count'] == len(genres) - 1, (
+            f'Проверьте, что после удаления жанра кэш ответа `{url}` '
+            'сбрасывается.'
+        )
+
+    def test_07_genre_list_cache_links(self, client):
+        Genre.objects.bulk_create(
+            Genre(name=f'Жанр {idx}', slug=f'genre-{idx}') for idx in range(7)
+        )
+        url = '/api/v1/genres/'
+        response = client.get(url, HTTP_HOST='internal:8000')
+        assert response.json()['next'].startswith('http://internal:8000/')
+
+        response = client.get(url, HTTP_HOST='api.example.com', secure=True)
+        assert response.json()['next'].startswith(
+            'https://api.example.com/'
+        ), (
+            f'Проверьте, что ссылки пагинации в кэшированном ответе `{url}` '
+            'построены для хоста текущего запроса.'
+        )
@@ -1,12 +1,16 @@
 from http import HTTPStatus
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Category, Genre, Title
 
 from tests.utils import (check_pagination, check_permissions,
                          create_categories, create_genre, create_titles)
 
 
 @pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures('nplusone')
 class Test04TitleAPI:
 
     def test_01_title_not_auth(self, client):
@@ -316,3 +320,35 @@ class Test04TitleAPI:
                           HTTPStatus.FORBIDDEN)
         check_permissions(moderator_client, url, data, 'модератора',
                           titles, HTTPStatus.FORBIDDEN)
+
+    def test_06_titles_constant_query_count(self, client, admin_client,
+                                            django_assert_num_queries):
+        create_titles(admin_client)
+        url = '/api/v1/titles/'
+        with CaptureQueriesContext(connection) as small_page:
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert len(response.json()['results']) == 2
+
+        category = Category.objects.first()
+        genres = list(Genre.objects.all())
+        for idx in range(3):
+            title = Title.objects.create(
+                name=f'Произведение {idx}', year=2000, category=category
+            )
+            title.genre.set(genres)
+        with CaptureQueriesContext(connection) as full_page:
+            response = client.get(url)
+        assert len(response.json()['results']) == 5
+
+        assert len(full_page) == len(small_page), (
+            'Проверьте, что количество SQL-запросов при GET-запросе к '
+            f'`{url}` не зависит от количества произведений на странице. '
+            f'Сейчас {len(small_page)} запросов для 2 произведений и '
+            f'{len(full_page)} для 5.'
+        )
+
+        title_id = Title.objects.first().id
+        # ETag, произведение с категорией, жанры.
+        with django_assert_num_queries(3):
+            client.get(f'{url}{title_id}/')
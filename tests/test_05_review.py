@@ -1,13 +1,18 @@
 from http import HTTPStatus
 
 import pytest
+from django.db import connection, connections
 from django.db.utils import IntegrityError
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Review, Title
 
+from api.views import ReviewViewSet
 from tests.utils import (check_fields, check_pagination, create_reviews,
                          create_single_review, create_titles)
 
 
 @pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures('nplusone')
 class Test05ReviewAPI:
 
     def test_01_review_not_auth(self, client, admin_client, admin, user_client,
@@ -384,3 +389,104 @@ class Test05ReviewAPI:
                 f'Проверьте, что DELETE-запрос {role} к чужому отзыву через '
                 f'`{url_template}` удаляет отзыв.'
             )
+
+    def test_06_reviews_cursor_pagination(self, client, admin_client,
+                                          django_user_model):
+        titles, _, _ = create_titles(admin_client)
+        title = Title.objects.get(id=titles[0]['id'])
+        for idx in range(7):
+            author = django_user_model.objects.create_user(
+                username=f'reviewer{idx}', email=f'reviewer{idx}@yamdb.fake'
+            )
+            Review.objects.create(
+                title=title, author=author, text=f'review {idx}', score=5
+            )
+        Review.objects.filter(text__in=('review 2', 'review 3')).update(
+            pub_date=Review.objects.get(text='review 4').pub_date
+        )
+        expected_ids = list(
+            title.reviews.order_by('-pub_date', 'id').values_list(
+                'id', flat=True
+            )
+        )
+
+        url = f'/api/v1/titles/{title.id}/reviews/?pagination=cursor'
+        received_ids = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            assert 'count' not in data, (
+                'Проверьте, что при курсорной пагинации ответ не содержит '
+                'ключ `count`.'
+            )
+            received_ids.extend(review['id'] for review in data['results'])
+            url = data['next']
+
+        assert received_ids == expected_ids, (
+            'Проверьте, что курсорная пагинация отзывов возвращает все '
+            'отзывы по одному разу в порядке (-pub_date, id).'
+        )
+
+    def test_07_review_post_query_count(self, admin_client, user_client,
+                                        django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        data = {'text': 'Ревью', 'score': 7}
+
+        # Пользователь, произведение, BEGIN, INSERT отзыва, UPDATE рейтинга.
+        with django_assert_num_queries(5):
+            response = user_client.post(url, data=data)
+        assert response.status_code == HTTPStatus.CREATED
+
+        response = user_client.post(url, data=data)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что повторный POST-запрос пользователя к '
+            f'`{url}` возвращает ответ со статусом 400.'
+        )
+        assert Review.objects.filter(title_id=titles[0]['id']).count() == 1
+
+    def test_08_reviews_query_budget(self, client, admin_client, admin, user,
+                                     user_client, settings, caplog,
+                                     monkeypatch):
+        _, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        settings.DEBUG = True
+
+        with CaptureQueriesContext(connection) as queries:
+            client.get(url)
+        # Произведение, ETag, количество и страница отзывов с авторами.
+        assert len(queries) == 4, (
+            f'Проверьте, что GET-запрос к `{url}` загружает авторов отзывов '
+            'тем же запросом, что и сами отзывы.'
+        )
+        assert 'budget' not in caplog.text
+
+        monkeypatch.setattr(ReviewViewSet, 'query_budget', {'list': 3})
+        client.get(url)
+        assert 'ReviewViewSet.list ran 4 queries, budget is 3' in caplog.text
+
+    def test_09_query_budget_counts_replicas(self, client, admin_client,
+                                             admin, settings, caplog,
+                                             monkeypatch):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        # Реплика - второе соединение с той же тестовой базой.
+        monkeypatch.setitem(
+            connections.settings, 'replica1', connections.settings['default']
+        )
+        settings.READ_REPLICAS = ['replica1']
+        settings.DEBUG = True
+        monkeypatch.setattr(ReviewViewSet, 'query_budget', {'list': 1})
+        try:
+            with CaptureQueriesContext(connections['replica1']) as queries:
+                client.get(url)
+        finally:
+            connections['replica1'].close()
+        assert queries, 'Отзывы должны читаться с реплики.'
+        message = 'ReviewViewSet.list ran 4 queries, budget is 1'
+        assert message in caplog.text, (
+            'Проверьте, что бюджет запросов учитывает запросы к репликам.'
+        )
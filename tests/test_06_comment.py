@@ -1,12 +1,16 @@
 from http import HTTPStatus
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Comment, Review
 
 from tests.utils import (check_fields, check_pagination, create_comments,
                          create_reviews, create_single_comment)
 
 
 @pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures('nplusone')
 class Test06CommentAPI:
 
     def test_01_comment_not_auth(self, client, admin_client, admin,
@@ -381,3 +385,65 @@ class Test06CommentAPI:
             'Проверьте, что DELETE-запрос неавторизованного пользователя к '
             f'`{url}` возвращает ответ со статусом 401.'
         )
+
+    def test_07_comments_cursor_pagination(self, client, admin_client, admin,
+                                           settings):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        review = Review.objects.get(title_id=titles[0]['id'])
+        for idx in range(7):
+            Comment.objects.create(
+                review=review, author=admin, text=f'comment {idx}'
+            )
+        expected_ids = list(
+            review.comments.order_by('-pub_date', 'id').values_list(
+                'id', flat=True
+            )
+        )
+
+        settings.CURSOR_PAGINATION = True
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{review.id}/comments/'
+        received_ids = []
+        while url:
+            data = client.get(url).json()
+            assert 'count' not in data, (
+                'Проверьте, что при включенной настройке CURSOR_PAGINATION '
+                f'эндпоинт `{url}` использует курсорную пагинацию.'
+            )
+            received_ids.extend(comment['id'] for comment in data['results'])
+            url = data['next']
+
+        assert received_ids == expected_ids, (
+            'Проверьте, что курсорная пагинация комментариев возвращает все '
+            'комментарии по одному разу в порядке (-pub_date, id).'
+        )
+
+    def test_08_comments_constant_query_count(self, client, admin_client,
+                                              admin, user):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        review = Review.objects.get(title_id=titles[0]['id'])
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{review.id}/comments/'
+        Comment.objects.create(review=review, author=admin, text='first')
+        with CaptureQueriesContext(connection) as single_comment:
+            client.get(url)
+
+        for idx in range(4):
+            Comment.objects.create(
+                review=review, author=user if idx % 2 else admin,
+                text=f'comment {idx}'
+            )
+        with CaptureQueriesContext(connection) as full_page:
+            response = client.get(url)
+        assert len(response.json()['results']) == 5
+        assert len(full_page) == len(single_comment), (
+            'Проверьте, что количество SQL-запросов при GET-запросе к '
+            f'`{url}` не зависит от количества комментариев на странице.'
+        )
+
+        response = client.get(
+            f'/api/v1/titles/{titles[0]["id"] + 1}/reviews/{review.id}/'
+            'comments/'
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что комментарии отзыва недоступны по адресу '
+            'с чужим title_id.'
+        )
@@ -0,0 +1,70 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import CommandError, call_command
+from reviews.models import Title
+
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    def get_title(self, client, title_id):
+        response = client.get(f'/api/v1/titles/{title_id}/')
+        assert response.status_code == HTTPStatus.OK
+        return response.json()
+
+    def test_01_rating_follows_reviews(self, client, admin_client, admin,
+                                       user, user_client, moderator,
+                                       moderator_client):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        reviews, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        assert self.get_title(client, title_id)['rating'] == 5, (
+            'Проверьте, что после создания отзывов рейтинг произведения '
+            'равен средней оценке.'
+        )
+
+        url = f'/api/v1/titles/{title_id}/reviews/{reviews[0]["id"]}/'
+        response = admin_client.patch(url, data={'score': 8})
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_title(client, title_id)['rating'] == 6, (
+            'Проверьте, что изменение оценки в отзыве пересчитывает '
+            'рейтинг произведения.'
+        )
+
+        response = admin_client.delete(url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_title(client, title_id)['rating'] == 5, (
+            'Проверьте, что удаление отзыва пересчитывает рейтинг '
+            'произведения.'
+        )
+
+        for review in reviews[1:]:
+            admin_client.delete(
+                f'/api/v1/titles/{title_id}/reviews/{review["id"]}/'
+            )
+        assert self.get_title(client, title_id)['rating'] is None, (
+            'Проверьте, что у произведения без отзывов рейтинг равен `None`.'
+        )
+
+    def test_02_rebuild_ratings_command(self, admin_client, admin):
+        create_reviews(admin_client, {admin: admin_client})
+        call_command('rebuild_ratings', '--check')
+
+        Title.objects.update(rating_sum=0, rating_count=0, rating=None)
+        with pytest.raises(CommandError):
+            call_command('rebuild_ratings', '--check')
+
+        call_command('rebuild_ratings')
+        call_command('rebuild_ratings', '--check')
+        title = Title.objects.get(rating_count=1)
+        assert (title.rating_sum, title.rating) == (5, 5), (
+            'Проверьте, что команда `rebuild_ratings` пересчитывает '
+            'рейтинг по таблице отзывов.'
+        )
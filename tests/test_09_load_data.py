@@ -0,0 +1,90 @@
+import os
+from csv import DictReader
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils.dateparse import parse_datetime
+from reviews.models import Comment, GenreTitle, Review, Title
+from users.models import User
+
+from tests.conftest import MANAGE_PATH
+
+DATA_DIR = os.path.join(MANAGE_PATH, 'static', 'data')
+
+
+def count_rows(filename):
+    with open(os.path.join(DATA_DIR, filename), encoding='utf-8') as f:
+        return sum(1 for _ in DictReader(f))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09LoadData:
+
+    def test_01_load_data_in_batches(self):
+        out = StringIO()
+        call_command(
+            'load_data', '--batch-size', '7', '--data-dir', DATA_DIR,
+            stdout=out
+        )
+        expected = (
+            (User, 'users.csv'),
+            (Title, 'titles.csv'),
+            (GenreTitle, 'genre_title.csv'),
+            (Review, 'review.csv'),
+            (Comment, 'comments.csv'),
+        )
+        for model, filename in expected:
+            assert model.objects.count() == count_rows(filename), (
+                f'Проверьте, что команда `load_data` загружает все строки '
+                f'из файла `{filename}`.'
+            )
+        assert 'rows/sec' in out.getvalue(), (
+            'Проверьте, что команда `load_data` сообщает скорость загрузки.'
+        )
+        call_command('rebuild_ratings', '--check', stdout=out)
+
+    def test_02_load_data_parallel(self):
+        out = StringIO()
+        call_command(
+            'load_data', '--batch-size', '10', '--jobs', '3',
+            '--data-dir', DATA_DIR, stdout=out
+        )
+        for model, filename in ((Review, 'review.csv'),
+                                (Comment, 'comments.csv')):
+            assert model.objects.count() == count_rows(filename), (
+                'Проверьте, что команда `load_data --jobs` загружает все '
+                f'строки из файла `{filename}`.'
+            )
+        output = out.getvalue()
+        assert output.index('titles.csv:') < output.index('review.csv:'), (
+            'Проверьте, что при параллельной загрузке отзывы загружаются '
+            'после произведений.'
+        )
+
+    def test_03_load_data_twice(self):
+        call_command('load_data', '--data-dir', DATA_DIR, stdout=StringIO())
+        users_count = User.objects.count()
+        out = StringIO()
+        call_command('load_data', '--data-dir', DATA_DIR, stdout=out)
+        assert 'already exiting' in out.getvalue()
+        assert User.objects.count() == users_count
+
+    def test_04_load_data_keeps_dates(self):
+        call_command('load_data', '--data-dir', DATA_DIR, stdout=StringIO())
+        for model, filename in ((Review, 'review.csv'),
+                                (Comment, 'comments.csv')):
+            with open(os.path.join(DATA_DIR, filename), encoding='utf-8') as f:
+                rows = list(DictReader(f))
+            for row in (rows[0], rows[-1]):
+                obj = model.objects.get(pk=row['id'])
+                expected = parse_datetime(row['pub_date'])
+                assert obj.pub_date == expected, (
+                    'Проверьте, что команда `load_data` сохраняет дату '
+                    f'публикации из файла `{filename}`.'
+                )
+                assert obj.modified == expected
+        field = Review._meta.get_field('pub_date')
+        assert field.auto_now_add, (
+            'Проверьте, что после загрузки auto_now_add снова включен.'
+        )
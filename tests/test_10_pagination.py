@@ -0,0 +1,94 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from reviews.models import Category
+
+from api.pagination import CountlessPagination
+from tests.utils import create_titles
+
+
+def count_queries(queries):
+    return sum(
+        query['sql'].startswith('SELECT COUNT(*)') for query in queries
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10Pagination:
+
+    def test_01_titles_count_is_cached(self, client, admin_client):
+        create_titles(admin_client)
+        url = '/api/v1/titles/'
+
+        with CaptureQueriesContext(connection) as queries:
+            assert client.get(url).json()['count'] == 2
+        assert count_queries(queries) == 1
+
+        with CaptureQueriesContext(connection) as queries:
+            assert client.get(url).json()['count'] == 2
+        assert count_queries(queries) == 0, (
+            f'Проверьте, что повторный GET-запрос к `{url}` берет `count` '
+            'из кэша.'
+        )
+
+        response = admin_client.post(url, data={
+            'name': 'Чужой',
+            'year': 1979,
+            'genre': ['horror'],
+            'category': 'films',
+        })
+        assert response.status_code == HTTPStatus.CREATED
+        assert client.get(url).json()['count'] == 3, (
+            f'Проверьте, что после создания произведения `count` в ответе '
+            f'на GET-запрос к `{url}` обновляется.'
+        )
+
+    def test_02_countless_pagination(self):
+        Category.objects.bulk_create(
+            Category(name=f'Категория {idx}', slug=f'category-{idx}')
+            for idx in range(7)
+        )
+        queryset = Category.objects.order_by('id')
+        factory = APIRequestFactory()
+        paginator = CountlessPagination()
+
+        request = Request(factory.get('/api/v1/categories/'))
+        with CaptureQueriesContext(connection) as queries:
+            page = paginator.paginate_queryset(queryset, request)
+        assert len(queries) == 1 and count_queries(queries) == 0
+        data = paginator.get_paginated_response(
+            [category.slug for category in page]
+        ).data
+        assert 'count' not in data
+        assert len(data['results']) == 5
+        assert data['previous'] is None
+        assert data['next'].endswith('?page=2')
+
+        request = Request(factory.get('/api/v1/categories/', {'page': 2}))
+        page = paginator.paginate_queryset(queryset, request)
+        data = paginator.get_paginated_response(
+            [category.slug for category in page]
+        ).data
+        assert len(data['results']) == 2
+        assert data['next'] is None
+        assert data['previous'].endswith('/api/v1/categories/')
+
+    def test_03_count_after_related_delete(self, client, admin_client):
+        _, categories, genres = create_titles(admin_client)
+        cases = (
+            ('category', categories[0]['slug'], 'categories'),
+            ('genre', genres[2]['slug'], 'genres'),
+        )
+        for param, slug, endpoint in cases:
+            url = f'/api/v1/titles/?{param}={slug}'
+            assert client.get(url).json()['count'] == 1
+            response = admin_client.delete(f'/api/v1/{endpoint}/{slug}/')
+            assert response.status_code == HTTPStatus.NO_CONTENT
+            assert client.get(url).json()['count'] == 0, (
+                f'Проверьте, что после удаления из `{endpoint}` `count` '
+                'произведений обновляется.'
+            )
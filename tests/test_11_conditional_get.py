@@ -0,0 +1,178 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import (
+    create_comments,
+    create_single_review,
+    create_titles
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11ConditionalGet:
+
+    def test_01_reviews_etag(self, client, admin_client, admin,
+                             django_assert_num_queries):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client}
+        )
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+
+        response = client.get(url)
+        etag = response['ETag']
+        assert etag, (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'заголовок ETag.'
+        )
+        assert not response.has_header('Last-Modified'), (
+            'Проверьте, что Last-Modified не отдается: по нему нельзя '
+            'заметить удаление записи или изменение рейтинга.'
+        )
+
+        # Произведение и агрегат для ETag, без выборки отзывов.
+        with django_assert_num_queries(2):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным '
+            'If-None-Match возвращает ответ со статусом 304.'
+        )
+        assert response['ETag'] == etag
+
+        admin_client.patch(
+            f'{url}{reviews[0]["id"]}/', data={'text': 'Новый текст'}
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что после изменения отзыва GET-запрос к `{url}` '
+            'со старым If-None-Match возвращает ответ со статусом 200.'
+        )
+        assert response['ETag'] != etag
+
+    def test_02_comments_etag(self, client, admin_client, admin):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client}
+        )
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+            'comments/'
+        )
+        etag = client.get(url)['ETag']
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+        admin_client.delete(f'{url}{comments[0]["id"]}/')
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что после удаления комментария GET-запрос к `{url}` '
+            'со старым If-None-Match возвращает ответ со статусом 200.'
+        )
+
+    def test_03_title_etag_follows_rating(self, client, admin_client, admin,
+                                          user_client):
+        _, _, titles = create_comments(admin_client, {admin: admin_client})
+        urls = (f'/api/v1/titles/{titles[0]["id"]}/', '/api/v1/titles/')
+        etags = {url: client.get(url)['ETag'] for url in urls}
+        for url, etag in etags.items():
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+                f'Проверьте, что GET-запрос к `{url}` с актуальным '
+                'If-None-Match возвращает ответ со статусом 304.'
+            )
+
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 1)
+        for url, etag in etags.items():
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что после изменения рейтинга GET-запрос к '
+                f'`{url}` со старым If-None-Match возвращает ответ со '
+                'статусом 200.'
+            )
+
+        # If-Modified-Since без ETag не дает 304 со старым рейтингом.
+        response = client.get(
+            urls[0], HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT'
+        )
+        assert response.status_code == HTTPStatus.OK
+
+    def test_04_delete_older_review(self, client, admin_client, admin,
+                                    user_client):
+        _, _, titles = create_comments(admin_client, {admin: admin_client})
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        older = client.get(url).json()['results'][0]['id']
+        create_single_review(user_client, titles[0]['id'], 'Новый', 7)
+        etag = client.get(url)['ETag']
+
+        admin_client.delete(f'{url}{older}/')
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после удаления старого отзыва GET-запрос со '
+            'старым If-None-Match возвращает ответ со статусом 200.'
+        )
+
+    def test_05_author_rename(self, client, admin_client, admin):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client}
+        )
+        urls = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+            'comments/',
+        )
+        etags = {url: client.get(url)['ETag'] for url in urls}
+
+        admin_client.patch(
+            f'/api/v1/users/{admin.username}/', data={'username': 'Renamed'}
+        )
+        for url, etag in etags.items():
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.OK, (
+                'Проверьте, что после переименования автора GET-запрос к '
+                f'`{url}` со старым If-None-Match возвращает ответ со '
+                'статусом 200.'
+            )
+            assert 'Renamed' in response.content.decode()
+
+    def test_06_title_list_etag_without_queries(self, client, admin_client,
+                                                django_assert_num_queries):
+        create_titles(admin_client)
+        url = '/api/v1/titles/?year=1984'
+        etag = client.get(url)['ETag']
+        with django_assert_num_queries(0):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что ETag списка произведений считается без '
+            'запросов к БД.'
+        )
+        assert client.get(
+            '/api/v1/titles/', HTTP_IF_NONE_MATCH=etag
+        ).status_code == HTTPStatus.OK, (
+            'Проверьте, что ETag списка зависит от параметров запроса.'
+        )
+
+    def test_07_title_list_etag_rating_swap(self, client, admin_client,
+                                            user_client):
+        titles, _, _ = create_titles(admin_client)
+        reviews = [
+            create_single_review(user_client, title['id'], 'Отзыв', 5).json()
+            for title in titles
+        ]
+        url = '/api/v1/titles/'
+        etag = client.get(url)['ETag']
+
+        # Сумма оценок по списку не меняется, меняются рейтинг и порядок.
+        for title, review, score in zip(titles, reviews, (9, 1)):
+            response = user_client.patch(
+                f'/api/v1/titles/{title["id"]}/reviews/{review["id"]}/',
+                data={'score': score},
+            )
+            assert response.status_code == HTTPStatus.OK
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после изменения рейтинга произведений GET-запрос '
+            f'к `{url}` со старым If-None-Match возвращает ответ со статусом '
+            '200.'
+        )
+        assert sorted(
+            title['rating'] for title in response.json()['results']
+        ) == [1, 9]
@@ -0,0 +1,89 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.authentication import access_token_for_user
+
+
+def claims_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {access_token_for_user(user)}'
+    )
+    return client
+
+
+def user_queries(queries):
+    return [
+        query['sql'] for query in queries
+        if 'FROM "users_user"' in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12ClaimsAuthentication:
+
+    def test_01_token_contains_role(self, client, user):
+        response = client.post('/api/v1/auth/token/', data={
+            'username': user.username,
+            'confirmation_code': default_token_generator.make_token(user),
+        })
+        assert response.status_code == HTTPStatus.OK
+        token = AccessToken(response.json()['token'])
+        assert (token['username'], token['role']) == (
+            user.username, user.role
+        ), (
+            'Проверьте, что токен, выданный `/api/v1/auth/token/`, содержит '
+            'username и role пользователя.'
+        )
+
+    def test_02_no_user_query_after_check(self, admin):
+        admin_client = claims_client(admin)
+        url = '/api/v1/users/'
+        assert admin_client.get(url).status_code == HTTPStatus.OK
+
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.post('/api/v1/categories/', data={
+                'name': 'Фильм', 'slug': 'films'
+            })
+        assert response.status_code == HTTPStatus.CREATED
+        assert not user_queries(queries), (
+            'Проверьте, что после проверки данных токена пользователь не '
+            'загружается из БД при каждом запросе.'
+        )
+
+    def test_03_role_change_revokes_claims(self, admin, user):
+        user.role = 'admin'
+        user.save()
+        promoted_client = claims_client(user)
+        url = '/api/v1/users/'
+        assert promoted_client.get(url).status_code == HTTPStatus.OK
+
+        response = claims_client(admin).patch(
+            f'{url}{user.username}/', data={'role': 'user'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert promoted_client.get(url).status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что после смены роли токен со старой ролью не дает '
+            'прежних прав.'
+        )
+
+    def test_04_me_returns_full_profile(self, user):
+        user_client = claims_client(user)
+        user_client.get('/api/v1/users/me/')
+        response = user_client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['email'] == user.email
+        assert response.json()['bio'] == user.bio
+
+        response = user_client.patch(
+            '/api/v1/users/me/', data={'first_name': 'Имя'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        user.refresh_from_db()
+        assert (user.first_name, user.email) == ('Имя', 'testuser@yamdb.fake')
@@ -0,0 +1,111 @@
+from http import HTTPStatus
+from smtplib import SMTPException
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+from users.models import OutboxMessage
+from users.outbox import claim_messages, deliver_outbox
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13Outbox:
+    url_signup = '/api/v1/auth/signup/'
+    valid_data = {'email': 'queued@yamdb.fake', 'username': 'queued'}
+
+    def test_01_signup_queues_mail(self, client):
+        outbox_before_count = len(mail.outbox)
+        response = client.post(self.url_signup, data=self.valid_data)
+        assert response.status_code == HTTPStatus.OK
+        assert len(mail.outbox) == outbox_before_count, (
+            'Проверьте, что при регистрации письмо не отправляется в '
+            'обработчике запроса, а ставится в очередь.'
+        )
+        message = OutboxMessage.objects.get()
+        assert message.to == self.valid_data['email']
+        assert message.sent is None
+
+        call_command('send_outbox')
+        assert len(mail.outbox) == outbox_before_count + 1
+        assert mail.outbox[-1].to == [self.valid_data['email']]
+        message.refresh_from_db()
+        assert message.sent is not None, (
+            'Проверьте, что команда `send_outbox` отмечает отправленные '
+            'письма.'
+        )
+
+        call_command('send_outbox')
+        assert len(mail.outbox) == outbox_before_count + 1, (
+            'Проверьте, что команда `send_outbox` не отправляет письмо '
+            'повторно.'
+        )
+
+    def test_02_failed_mail_is_retried(self, client, monkeypatch):
+        client.post(self.url_signup, data=self.valid_data)
+
+        def fail(self):
+            raise SMTPException('Connection refused')
+
+        monkeypatch.setattr('users.outbox.EmailMessage.send', fail)
+        call_command('send_outbox')
+        message = OutboxMessage.objects.get()
+        assert message.attempts == 1
+        assert message.sent is None
+        assert message.next_attempt > timezone.now(), (
+            'Проверьте, что неотправленное письмо откладывается перед '
+            'следующей попыткой.'
+        )
+        assert 'Connection refused' in message.last_error
+
+        monkeypatch.undo()
+        call_command('send_outbox')
+        message.refresh_from_db()
+        assert message.sent is None, (
+            'Проверьте, что письмо не отправляется повторно раньше '
+            '`next_attempt`.'
+        )
+
+        OutboxMessage.objects.update(next_attempt=timezone.now())
+        call_command('send_outbox')
+        message.refresh_from_db()
+        assert message.sent is not None
+
+    def test_03_connection_failure(self, client, monkeypatch):
+        client.post(self.url_signup, data=self.valid_data)
+
+        class RefusedConnection:
+            def open(self):
+                raise SMTPException('Connection refused')
+
+        monkeypatch.setattr(
+            'users.outbox.get_connection',
+            lambda **kwargs: RefusedConnection(),
+        )
+        call_command('send_outbox')
+        message = OutboxMessage.objects.get()
+        assert message.attempts == 1, (
+            'Проверьте, что ошибка соединения с почтовым сервером '
+            'считается неудачной попыткой отправки.'
+        )
+        assert message.next_attempt > timezone.now()
+        assert 'Connection refused' in message.last_error
+
+    def test_04_batch_is_claimed(self, client):
+        client.post(self.url_signup, data=self.valid_data)
+        outbox_before_count = len(mail.outbox)
+
+        claimed = claim_messages()
+        assert [message.to for message in claimed] == [
+            self.valid_data['email']
+        ]
+        assert deliver_outbox() == (0, 0), (
+            'Проверьте, что письма, захваченные одним воркером, не '
+            'отправляет другой.'
+        )
+        assert len(mail.outbox) == outbox_before_count
+
+        # Воркер завершился, не отправив пачку: письмо снова доступно.
+        OutboxMessage.objects.update(next_attempt=timezone.now())
+        assert deliver_outbox() == (1, 0)
+        assert len(mail.outbox) == outbox_before_count + 1
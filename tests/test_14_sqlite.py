@@ -0,0 +1,37 @@
+import pytest
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.db import configure_sqlite
+
+
+def pragma(name):
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.django_db
+class Test14SQLitePragmas:
+
+    def test_01_pragmas_applied_on_connect(self):
+        assert pragma('busy_timeout') == (
+            settings.SQLITE_PRAGMAS['busy_timeout']
+        ), (
+            'Проверьте, что PRAGMA из SQLITE_PRAGMAS выполняются при '
+            'открытии соединения.'
+        )
+
+    def test_02_configure_sqlite(self, settings):
+        settings.SQLITE_PRAGMAS = {
+            'busy_timeout': 1234,
+            'cache_size': -2048,
+        }
+        with CaptureQueriesContext(connection) as queries:
+            configure_sqlite(sender=type(connection), connection=connection)
+        assert not queries, (
+            'Проверьте, что PRAGMA не попадают в connection.queries.'
+        )
+        assert pragma('busy_timeout') == 1234
+        assert pragma('cache_size') == -2048
@@ -0,0 +1,122 @@
+import time
+
+import pytest
+from django.core.cache import cache
+
+from core.db import PIN_COOKIE, ReplicaRouter
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.fixture
+def read_aliases(settings, monkeypatch):
+    """
+    Включает реплику с псевдонимом default и собирает базы, которые
+    роутер выбирает для чтения (None - реплика не используется).
+    """
+    settings.READ_REPLICAS = ['default']
+    aliases = []
+    db_for_read = ReplicaRouter.db_for_read
+
+    def spy(self, model, **hints):
+        alias = db_for_read(self, model, **hints)
+        aliases.append(alias)
+        return alias
+
+    monkeypatch.setattr(ReplicaRouter, 'db_for_read', spy)
+    return aliases
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15Replicas:
+
+    def test_01_safe_requests_read_from_replica(self, client, admin_client,
+                                                read_aliases):
+        titles, _, _ = create_titles(admin_client)
+        read_aliases.clear()
+        client.get(f'/api/v1/titles/{titles[0]["id"]}/reviews/')
+        assert read_aliases and set(read_aliases) == {'default'}, (
+            'Проверьте, что GET-запрос к отзывам читает данные с реплики.'
+        )
+
+        read_aliases.clear()
+        client.get('/api/v1/users/')
+        assert set(read_aliases) <= {None}, (
+            'Проверьте, что запросы к эндпоинтам без ReplicaReadMixin '
+            'не читают с реплики.'
+        )
+
+    def test_02_read_your_writes(self, admin_client, user_client,
+                                 moderator_client, read_aliases):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        create_single_review(user_client, titles[0]['id'], 'Текст', 5)
+
+        read_aliases.clear()
+        user_client.get(url)
+        assert read_aliases and set(read_aliases) == {None}, (
+            'Проверьте, что после записи пользователь читает данные из '
+            'основной БД.'
+        )
+
+        read_aliases.clear()
+        moderator_client.get(url)
+        assert 'default' in read_aliases, (
+            'Проверьте, что запись одного пользователя не закрепляет за '
+            'основной БД других пользователей.'
+        )
+
+    def test_03_pin_expires(self, settings, admin_client, user_client,
+                            read_aliases):
+        settings.REPLICA_PIN_SECONDS = 0.01
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Текст', 5)
+        time.sleep(0.05)
+
+        read_aliases.clear()
+        user_client.get(f'/api/v1/titles/{titles[0]["id"]}/reviews/')
+        assert 'default' in read_aliases, (
+            'Проверьте, что пользователь читает с реплики по истечении '
+            'REPLICA_PIN_SECONDS.'
+        )
+
+    def test_04_pin_is_signed_cookie(self, admin_client, user_client,
+                                     client, read_aliases):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        create_single_review(user_client, titles[0]['id'], 'Текст', 5)
+        assert PIN_COOKIE in user_client.cookies, (
+            'Проверьте, что после записи клиент получает cookie '
+            'закрепления за основной БД.'
+        )
+        cache.clear()
+        read_aliases.clear()
+        user_client.get(url)
+        assert set(read_aliases) == {None}, (
+            'Проверьте, что закрепление за основной БД не хранится в '
+            'кэше процесса.'
+        )
+
+        client.cookies[PIN_COOKIE] = '1'
+        read_aliases.clear()
+        client.get(url)
+        assert 'default' in read_aliases, (
+            'Проверьте, что cookie без подписи не закрепляет клиента за '
+            'основной БД.'
+        )
+
+    def test_05_cache_filled_from_primary(self, client, admin_client,
+                                          read_aliases):
+        create_titles(admin_client)
+        for url in ('/api/v1/genres/', '/api/v1/categories/'):
+            read_aliases.clear()
+            client.get(url)
+            assert read_aliases and set(read_aliases) == {None}, (
+                'Проверьте, что кэшируемый список читается из основной БД.'
+            )
+
+        read_aliases.clear()
+        client.get('/api/v1/titles/')
+        assert set(read_aliases) == {None, 'default'}, (
+            'Проверьте, что количество записей для кэша считается по '
+            'основной БД, а страница списка читается с реплики.'
+        )
@@ -0,0 +1,105 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from reviews.models import Title
+
+from tests.utils import create_titles
+
+
+def search(client, text):
+    response = client.get('/api/v1/titles/', data={'search': text})
+    assert response.status_code == HTTPStatus.OK, (
+        'Проверьте, что GET-запрос к `/api/v1/titles/` с параметром '
+        '`search` возвращает ответ со статусом 200.'
+    )
+    return [title['name'] for title in response.json()['results']]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16TitleSearch:
+
+    def test_01_search_by_name_and_description(self, client, admin_client):
+        create_titles(admin_client)
+        assert search(client, 'терминатор') == ['Терминатор'], (
+            'Проверьте, что параметр `search` ищет по названию без учета '
+            'регистра.'
+        )
+        assert search(client, 'yippie') == ['Крепкий орешек'], (
+            'Проверьте, что параметр `search` ищет по описанию.'
+        )
+        assert search(client, 'креп') == ['Крепкий орешек'], (
+            'Проверьте, что параметр `search` ищет слова по префиксу.'
+        )
+        assert search(client, 'крепкий терминатор') == []
+        assert search(client, '"* OR') == []
+
+    def test_02_index_follows_changes(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        admin_client.patch(url, data={'name': 'Чужой'})
+        assert search(client, 'терминатор') == []
+        assert search(client, 'чужой') == ['Чужой'], (
+            'Проверьте, что индекс поиска обновляется при изменении '
+            'произведения.'
+        )
+        admin_client.delete(url)
+        assert search(client, 'чужой') == [], (
+            'Проверьте, что индекс поиска обновляется при удалении '
+            'произведения.'
+        )
+
+    def test_03_ranked_results(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        Title.objects.filter(pk=titles[0]['id']).update(
+            description='Крепкий крепкий крепкий'
+        )
+        assert search(client, 'крепкий') == [
+            'Терминатор', 'Крепкий орешек'
+        ], (
+            'Проверьте, что результаты поиска отсортированы по '
+            'релевантности.'
+        )
+
+    def test_04_rebuild_command(self, client, admin_client):
+        create_titles(admin_client)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO reviews_title_search(reviews_title_search) "
+                "VALUES ('delete-all')"
+            )
+        assert search(client, 'терминатор') == []
+        # Количество результатов закэшировано CachedCountPagination.
+        cache.clear()
+        call_command('rebuild_search_index')
+        assert search(client, 'терминатор') == ['Терминатор']
+
+    def test_05_table_remake(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        old_field = Title._meta.get_field('year')
+        new_field = old_field.clone()
+        new_field.null = True
+        new_field.set_attributes_from_name('year')
+        # AlterField в SQLite пересоздает таблицу и удаляет ее триггеры.
+        with connection.schema_editor() as editor:
+            editor.alter_field(Title, old_field, new_field)
+        try:
+            Title.objects.filter(pk=titles[0]['id']).update(name='Чужой')
+            call_command('migrate', verbosity=0)
+            assert search(client, 'чужой') == ['Чужой'], (
+                'Проверьте, что после migrate индекс поиска перестраивается, '
+                'если таблица произведений была пересоздана.'
+            )
+            admin_client.patch(
+                f'/api/v1/titles/{titles[0]["id"]}/', data={'name': 'Хищник'}
+            )
+            assert search(client, 'чужой') == []
+            assert search(client, 'хищник') == ['Хищник'], (
+                'Проверьте, что после migrate триггеры индекса поиска '
+                'восстановлены.'
+            )
+        finally:
+            with connection.schema_editor() as editor:
+                editor.alter_field(Title, new_field, old_field)
@@ -0,0 +1,139 @@
+import time
+from http import HTTPStatus
+
+import pytest
+from django.db import transaction
+
+from api.suggest import PrefixIndex
+from reviews.models import Genre, Title
+from tests.utils import create_titles
+
+URL = '/api/v1/suggest/'
+
+
+def test_prefix_index():
+    index = PrefixIndex()
+    index.add(1, 'Крепкий орешек', 'a')
+    index.add(2, 'Крестный отец', 'b')
+    index.add(3, 'Орешек знаний', 'c')
+    assert index.search('кре', 10) == ['a', 'b']
+    assert index.search('КРЕП', 10) == ['a']
+    assert index.search('ореш', 10) == ['c', 'a'], (
+        'Совпадения с началом строки должны идти перед совпадениями с '
+        'началом слова.'
+    )
+    assert index.search('кре', 1) == ['a']
+    assert PrefixIndex([
+        (1, 'Крепкий орешек', 'a'), (3, 'Орешек знаний', 'c'),
+    ]).search('ореш', 10) == ['c', 'a']
+    assert index.search('', 10) == []
+
+    index.add(1, 'Чужой', 'a')
+    assert index.search('ореш', 10) == ['c']
+    index.remove(3)
+    assert index.search('ореш', 10) == []
+    assert index.search('чуж', 10) == ['a']
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17Suggest:
+
+    def test_01_suggest(self, client, admin_client,
+                        django_assert_num_queries):
+        create_titles(admin_client)
+        response = client.get(URL, data={'q': 'тер'})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{URL}` возвращает ответ со '
+            'статусом 200.'
+        )
+        data = response.json()
+        assert [title['name'] for title in data['titles']] == [
+            'Терминатор'
+        ]
+        assert set(data) == {'titles', 'genres', 'categories'}
+
+        with django_assert_num_queries(0):
+            response = client.get(URL, data={'q': 'ореш'})
+        assert [
+            title['name'] for title in response.json()['titles']
+        ] == ['Крепкий орешек'], (
+            'Проверьте, что подсказки находят слова внутри названия и '
+            'отдаются без запросов к БД.'
+        )
+
+    def test_02_suggest_follows_changes(self, client, admin_client):
+        titles, categories, genres = create_titles(admin_client)
+        assert client.get(URL, data={'q': 'чуж'}).json()['titles'] == []
+
+        admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/', data={'name': 'Чужой'}
+        )
+        data = client.get(URL, data={'q': 'чуж'}).json()
+        assert data['titles'] == [
+            {'id': titles[0]['id'], 'name': 'Чужой', 'year': 1984}
+        ], (
+            'Проверьте, что индекс подсказок обновляется при изменении '
+            'произведения.'
+        )
+        assert client.get(URL, data={'q': 'терм'}).json()['titles'] == []
+
+        category = categories[0]
+        admin_client.delete(f'/api/v1/categories/{category["slug"]}/')
+        data = client.get(URL, data={'q': category['name'][:3]}).json()
+        assert category not in data['categories'], (
+            'Проверьте, что индекс подсказок обновляется при удалении '
+            'категории.'
+        )
+
+    def test_03_limit(self, client, admin_client):
+        create_titles(admin_client)
+        response = client.get(URL, data={'q': 'к', 'limit': 0})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = client.get(URL)
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_04_rollback(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        assert client.get(URL, data={'q': 'чуж'}).json()['titles'] == []
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                Title.objects.get(pk=titles[0]['id']).delete()
+                Title.objects.create(name='Чужой', year=1979)
+                raise RuntimeError
+        data = client.get(URL, data={'q': 'чуж'}).json()
+        assert data['titles'] == [], (
+            'Проверьте, что индекс подсказок обновляется только после '
+            'фиксации транзакции.'
+        )
+        assert client.get(URL, data={'q': 'терм'}).json()['titles']
+
+    def test_05_index_timeout(self, settings, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        assert client.get(URL, data={'q': 'чуж'}).json()['titles'] == []
+        # update() не вызывает сигналы и не увеличивает версию модели,
+        # как изменение, сделанное другим процессом при кэше в памяти.
+        Title.objects.filter(pk=titles[0]['id']).update(name='Чужой')
+        assert client.get(URL, data={'q': 'чуж'}).json()['titles'] == []
+
+        settings.SUGGEST_INDEX_TIMEOUT = 0.01
+        time.sleep(0.05)
+        data = client.get(URL, data={'q': 'чуж'}).json()
+        assert [title['id'] for title in data['titles']] == [
+            titles[0]['id']
+        ], (
+            'Проверьте, что индекс подсказок строится заново через '
+            'SUGGEST_INDEX_TIMEOUT секунд.'
+        )
+
+    def test_06_delete_in_atomic(self, client, admin_client):
+        _, _, genres = create_titles(admin_client)
+        genre = genres[0]
+        prefix = genre['name'][:3]
+        assert genre in client.get(URL, data={'q': prefix}).json()['genres']
+        with transaction.atomic():
+            Genre.objects.get(slug=genre['slug']).delete()
+        data = client.get(URL, data={'q': prefix}).json()
+        assert genre not in data['genres'], (
+            'Проверьте, что удаление внутри transaction.atomic() убирает '
+            'запись из индекса подсказок.'
+        )
@@ -0,0 +1,61 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments
+
+SCAN = re.compile(r'^SCAN (\w+)( USING .*)?$')
+
+
+def full_scans(sql):
+    """
+    Таблицы, которые SQLite читает целиком.
+
+    Без WHERE допустим обход по индексу в порядке сортировки (страница
+    списка с LIMIT), с WHERE любой обход таблицы означает, что фильтр
+    не попал в индекс.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql.replace("%", "%%")}')
+        plan = [row[-1] for row in cursor.fetchall()]
+    filtered = ' WHERE ' in sql
+    return [
+        match.group(1) for match in map(SCAN.match, plan)
+        if match and (filtered or not match.group(2))
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18QueryPlans:
+
+    def test_01_list_queries_use_indexes(self, client, admin_client, admin):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client}
+        )
+        title_id, review_id = titles[0]['id'], reviews[0]['id']
+        urls = (
+            '/api/v1/titles/',
+            '/api/v1/titles/?year=1984',
+            '/api/v1/titles/?genre=horror',
+            '/api/v1/titles/?category=films',
+            '/api/v1/titles/?category=films&year=1984',
+            f'/api/v1/titles/{title_id}/reviews/',
+            f'/api/v1/titles/{title_id}/reviews/?pagination=cursor',
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+        )
+        for url in urls:
+            with CaptureQueriesContext(connection) as queries:
+                client.get(url)
+            # Проверяются выборки страницы и запросы с фильтрами.
+            for query in queries.captured_queries:
+                sql = query['sql']
+                if not sql.startswith('SELECT') or not (
+                    ' WHERE ' in sql or ' LIMIT ' in sql
+                ):
+                    continue
+                assert not full_scans(sql), (
+                    f'Проверьте индексы: запрос GET `{url}` читает таблицу '
+                    f'целиком:\n{sql}'
+                )
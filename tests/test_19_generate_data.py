@@ -0,0 +1,99 @@
+import os
+from collections import Counter
+from csv import DictReader
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from reviews.models import Comment, Review, Title
+from users.models import User
+
+FILES = (
+    ('users.csv', ['id', 'username', 'email', 'role', 'bio']),
+    ('category.csv', ['id', 'name', 'slug']),
+    ('genre.csv', ['id', 'name', 'slug']),
+    ('titles.csv', ['id', 'name', 'year', 'description', 'category']),
+    ('genre_title.csv', ['id', 'genre_id', 'title_id']),
+    ('review.csv', ['id', 'title_id', 'text', 'author', 'score', 'pub_date']),
+    ('comments.csv', ['id', 'text', 'pub_date', 'author', 'review_id']),
+)
+
+
+def generate(output_dir, *args):
+    call_command(
+        'generate_data', '--output-dir', str(output_dir), '--users', '50',
+        '--titles', '40', '--reviews', '600', '--comments', '900', *args,
+        stdout=StringIO(),
+    )
+
+
+def read_rows(output_dir, filename):
+    with open(os.path.join(output_dir, filename), encoding='utf-8') as f:
+        return list(DictReader(f))
+
+
+def read_bytes(output_dir):
+    result = {}
+    for filename, _ in FILES:
+        with open(os.path.join(output_dir, filename), 'rb') as f:
+            result[filename] = f.read()
+    return result
+
+
+class Test19GenerateData:
+
+    def test_01_format(self, tmp_path):
+        generate(tmp_path)
+        for filename, header in FILES:
+            with open(tmp_path / filename, encoding='utf-8') as f:
+                assert DictReader(f).fieldnames == header, (
+                    f'Проверьте, что команда `generate_data` пишет в '
+                    f'`{filename}` заголовок в формате `load_data`.'
+                )
+        reviews = read_rows(tmp_path, 'review.csv')
+        assert len(reviews) == 600
+        assert len(read_rows(tmp_path, 'comments.csv')) == 900
+        pairs = {(row['title_id'], row['author']) for row in reviews}
+        assert len(pairs) == len(reviews), (
+            'Проверьте, что команда `generate_data` не создает двух '
+            'отзывов одного автора на одно произведение.'
+        )
+
+    def test_02_deterministic(self, tmp_path):
+        generate(tmp_path / 'first')
+        generate(tmp_path / 'second')
+        generate(tmp_path / 'other', '--seed', '1')
+        first = read_bytes(tmp_path / 'first')
+        assert first == read_bytes(tmp_path / 'second'), (
+            'Проверьте, что команда `generate_data` с одинаковым --seed '
+            'генерирует одинаковые файлы.'
+        )
+        assert first != read_bytes(tmp_path / 'other')
+
+    def test_03_skew(self, tmp_path):
+        generate(tmp_path)
+        counts = Counter(
+            row['title_id'] for row in read_rows(tmp_path, 'review.csv')
+        )
+        top = sum(count for _, count in counts.most_common(4))
+        assert top > 600 * 0.3, (
+            'Проверьте, что самые популярные произведения получают '
+            'большую часть отзывов.'
+        )
+
+    def test_04_refuses_to_overwrite(self, tmp_path):
+        generate(tmp_path)
+        with pytest.raises(CommandError):
+            generate(tmp_path)
+        generate(tmp_path, '--force', '--seed', '2')
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_load_generated_data(self, tmp_path):
+        generate(tmp_path)
+        call_command('load_data', '--data-dir', str(tmp_path),
+                     stdout=StringIO())
+        assert User.objects.count() == 50
+        assert Title.objects.count() == 40
+        assert Review.objects.count() == 600
+        assert Comment.objects.count() == 900
+        call_command('rebuild_ratings', '--check', stdout=StringIO())
@@ -0,0 +1,78 @@
+import logging
+import re
+
+import pytest
+
+from tests.utils import create_titles
+
+SERVER_TIMING = re.compile(
+    r'db;dur=([\d.]+);desc="(\d+) queries", app;dur=([\d.]+), '
+    r'render;dur=([\d.]+), total;dur=([\d.]+)'
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20RequestTiming:
+
+    def test_01_disabled_by_default(self, client):
+        response = client.get('/api/v1/titles/')
+        assert not response.has_header('Server-Timing'), (
+            'Проверьте, что без REQUEST_TIMING заголовок Server-Timing не '
+            'добавляется.'
+        )
+
+    def test_02_server_timing(self, settings, client, admin_client,
+                              django_assert_num_queries, caplog):
+        settings.REQUEST_TIMING = True
+        create_titles(admin_client)
+        with caplog.at_level(logging.INFO, logger='api.timing'):
+            response = client.get('/api/v1/titles/')
+        match = SERVER_TIMING.fullmatch(response.get('Server-Timing', ''))
+        assert match, (
+            'Проверьте, что при REQUEST_TIMING ответ содержит заголовок '
+            'Server-Timing с метриками db, app, render и total.'
+        )
+
+        records = [
+            record for record in caplog.records if record.name == 'api.timing'
+        ]
+        assert records, 'Проверьте, что замеры запроса пишутся в лог.'
+        fields = records[-1].timing
+        assert fields['view'] == 'TitleViewSet.list', (
+            'Проверьте, что строка лога содержит имя вьюсета и действия.'
+        )
+        assert fields['queries'] == int(match.group(2)) > 0
+        assert fields['status'] == 200
+        assert 'view=TitleViewSet.list' in records[-1].getMessage()
+
+    def test_03_phases_add_up(self, settings, client, admin_client, caplog):
+        settings.REQUEST_TIMING = True
+        create_titles(admin_client)
+        with caplog.at_level(logging.INFO, logger='api.timing'):
+            response = client.get('/api/v1/titles/')
+        db, _, app, render, total = SERVER_TIMING.fullmatch(
+            response['Server-Timing']
+        ).groups()
+        assert float(db) + float(app) + float(render) == pytest.approx(
+            float(total), abs=0.02
+        ), 'Проверьте, что фазы db, app и render в сумме дают total.'
+        assert float(app) > 0 and float(render) > 0
+
+        fields = [
+            record.timing for record in caplog.records
+            if record.name == 'api.timing'
+        ][-1]
+        assert fields['db_ms'] + fields['app_ms'] + fields['render_ms'] == (
+            pytest.approx(fields['total_ms'], abs=0.02)
+        )
+
+    def test_04_view_names(self, settings, client, caplog):
+        settings.REQUEST_TIMING = True
+        with caplog.at_level(logging.INFO, logger='api.timing'):
+            client.post('/api/v1/auth/signup/', data={})
+            client.get('/api/v1/categories/')
+        views = [
+            record.timing['view'] for record in caplog.records
+            if record.name == 'api.timing'
+        ]
+        assert views == ['signup', 'CategoryViewSet.list']
@@ -0,0 +1,164 @@
+import os
+import re
+import threading
+
+import pytest
+
+from api.metrics import CACHE_REQUESTS, FileStore, MemoryStore
+from tests.utils import create_titles
+
+
+def sample(text, name, **labels):
+    """Значение строки метрики name с метками labels или None."""
+    for line in text.splitlines():
+        match = re.fullmatch(r'(\w+)(?:\{(.*)\})? (\S+)', line)
+        if not match or match.group(1) != name:
+            continue
+        found = dict(re.findall(r'(\w+)="([^"]*)"', match.group(2) or ''))
+        if found == labels:
+            return float(match.group(3))
+    return None
+
+
+@pytest.fixture
+def metrics_dir(settings, tmp_path):
+    settings.METRICS = True
+    settings.METRICS_DIR = str(tmp_path)
+    return tmp_path
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21Metrics:
+
+    def test_01_request_metrics(self, metrics_dir, client, admin_client):
+        create_titles(admin_client)
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/')
+        client.post('/api/v1/auth/signup/', data={})
+
+        response = admin_client.get('/metrics')
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        text = response.content.decode()
+
+        assert sample(
+            text, 'yamdb_http_requests_total',
+            view='TitleViewSet.list', method='GET', status='200',
+        ) == 2, 'Проверьте, что запросы считаются по представлению и коду.'
+        assert sample(
+            text, 'yamdb_http_requests_total',
+            view='signup', method='POST', status='400',
+        ) == 1
+        assert sample(
+            text, 'yamdb_http_request_duration_seconds_bucket',
+            view='TitleViewSet.list', method='GET', le='+Inf',
+        ) == 2, 'Проверьте, что время запросов пишется в гистограмму.'
+        assert sample(
+            text, 'yamdb_http_request_duration_seconds_count',
+            view='TitleViewSet.list', method='GET',
+        ) == 2
+        assert sample(
+            text, 'yamdb_http_request_db_queries_bucket',
+            view='TitleViewSet.list', method='GET', le='0',
+        ) == 0, 'Проверьте, что пишется гистограмма числа SQL-запросов.'
+        assert '# TYPE yamdb_http_request_db_queries histogram' in text
+
+    def test_02_buckets_are_cumulative(self, metrics_dir, client,
+                                       admin_client):
+        client.get('/api/v1/categories/')
+        text = admin_client.get('/metrics').content.decode()
+        counts = [
+            float(value) for value in re.findall(
+                r'yamdb_http_request_duration_seconds_bucket\{'
+                r'view="CategoryViewSet.list",method="GET",le="[^"]+"\} (\S+)',
+                text,
+            )
+        ]
+        assert len(counts) == 12
+        assert counts == sorted(counts) and counts[-1] == 1
+
+    def test_03_cache_hits(self, metrics_dir, client, admin_client):
+        client.get('/api/v1/genres/')
+        client.get('/api/v1/genres/')
+        text = admin_client.get('/metrics').content.decode()
+        assert sample(
+            text, 'yamdb_cache_requests_total', cache='list', result='miss'
+        ) == 1, 'Проверьте, что промахи кэша списков считаются.'
+        assert sample(
+            text, 'yamdb_cache_requests_total', cache='list', result='hit'
+        ) == 1, 'Проверьте, что попадания в кэш списков считаются.'
+
+    def test_04_disabled(self, settings, client):
+        settings.METRICS = False
+        assert client.get('/metrics').status_code == 404
+
+    def test_05_access(self, settings, metrics_dir, client, user_client,
+                       admin_client):
+        for api_client in (client, user_client):
+            assert api_client.get('/metrics').status_code == 403, (
+                'Проверьте, что метрики недоступны анонимному пользователю '
+                'и пользователю без роли администратора.'
+            )
+        assert admin_client.get('/metrics').status_code == 200
+
+        settings.METRICS_ALLOWED_IPS = ['127.0.0.1']
+        response = client.get('/metrics', REMOTE_ADDR='127.0.0.1')
+        assert response.status_code == 200, (
+            'Проверьте, что метрики доступны адресам из '
+            'METRICS_ALLOWED_IPS без аутентификации.'
+        )
+        response = client.get('/metrics', REMOTE_ADDR='10.0.0.1')
+        assert response.status_code == 403
+
+
+def test_memory_store_threads():
+    store = MemoryStore()
+    key = ('requests', (('view', 'test'),))
+
+    def work():
+        for _ in range(1000):
+            store.inc(key, 1)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    store.inc(key, 1)
+    assert store.collect() == {key: 8001}
+    assert len(store._shards) == 1, (
+        'Проверьте, что значения завершившихся потоков объединяются.'
+    )
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='os.fork is required')
+def test_file_store_processes(metrics_dir):
+    CACHE_REQUESTS.inc(cache='list', result='hit')
+    pid = os.fork()
+    if pid == 0:
+        try:
+            CACHE_REQUESTS.inc(2, cache='list', result='hit')
+            CACHE_REQUESTS.inc(cache='list', result='miss')
+        finally:
+            os._exit(0)
+    os.waitpid(pid, 0)
+
+    assert len(list(metrics_dir.glob('metrics-*.db'))) == 2, (
+        'Проверьте, что каждый процесс пишет метрики в свой файл.'
+    )
+    totals = FileStore(str(metrics_dir)).collect()
+    assert totals[
+        ('yamdb_cache_requests_total', (('cache', 'list'), ('result', 'hit')))
+    ] == 3
+    assert totals[
+        ('yamdb_cache_requests_total', (('cache', 'list'), ('result', 'miss')))
+    ] == 1
+
+
+def test_file_store_grows(tmp_path):
+    store = FileStore(str(tmp_path))
+    for index in range(5000):
+        store.inc(('metric', (('index', str(index)),)), index)
+    totals = FileStore(str(tmp_path)).collect()
+    assert len(totals) == 5000
+    assert totals[('metric', (('index', '4999'),))] == 4999
@@ -0,0 +1,80 @@
+import logging
+
+import pytest
+
+from api.nplusone import NPlusOneError, fingerprint
+from api.views import ReviewViewSet
+from tests.utils import create_reviews
+
+
+def test_fingerprint():
+    assert fingerprint(
+        'SELECT "a" FROM "t" WHERE "t"."id" IN (%s, %s, %s) LIMIT 21'
+    ) == fingerprint(
+        'SELECT "a" FROM "t" WHERE "t"."id" IN (%s) LIMIT 5'
+    ), 'Проверьте, что значения и длина IN (...) не влияют на структуру.'
+    assert fingerprint(
+        "SELECT \"a\" FROM \"t\" WHERE \"t\".\"slug\" = 'it''s'"
+    ) == 'SELECT "a" FROM "t" WHERE "t"."slug" = ?'
+    assert fingerprint('SELECT "a" FROM "t"') != fingerprint(
+        'SELECT "b" FROM "t"'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22NPlusOne:
+
+    @pytest.fixture
+    def lazy_authors(self, monkeypatch):
+        """Отзывы без select_related: автор загружается для каждого."""
+        monkeypatch.setattr(
+            ReviewViewSet, 'get_queryset',
+            lambda self: self.get_title().reviews.order_by('pk'),
+        )
+
+    @pytest.fixture
+    def reviews_url(self, admin_client, admin, user_client, user,
+                    moderator_client, moderator):
+        _, titles = create_reviews(admin_client, {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client,
+        })
+        return f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+
+    def test_01_raise(self, nplusone, client, reviews_url, lazy_authors):
+        with pytest.raises(NPlusOneError) as error:
+            client.get(reviews_url)
+        report = str(error.value)
+        assert report.startswith('N+1 queries in ReviewViewSet.list:'), (
+            'Проверьте, что отчет содержит имя представления.'
+        )
+        assert 'field: ReviewSerializer.author' in report, (
+            'Проверьте, что отчет содержит поле сериализатора.'
+        )
+        assert 'at: api/' in report, (
+            'Проверьте, что отчет содержит место в коде проекта.'
+        )
+        assert '3 x SELECT' in report
+
+    def test_02_warn(self, settings, client, reviews_url, lazy_authors,
+                     caplog):
+        settings.NPLUSONE = 'warn'
+        with caplog.at_level(logging.WARNING, logger='api.nplusone'):
+            response = client.get(reviews_url)
+        assert response.status_code == 200
+        records = [
+            record for record in caplog.records
+            if record.name == 'api.nplusone'
+        ]
+        assert len(records) == 1, (
+            'Проверьте, что при NPLUSONE = "warn" N+1 запросы пишутся в лог.'
+        )
+        assert 'ReviewSerializer.author' in records[0].getMessage()
+
+    def test_03_no_false_positive(self, nplusone, client, reviews_url):
+        assert client.get(reviews_url).status_code == 200
+
+    def test_04_disabled(self, settings, client, reviews_url, lazy_authors):
+        settings.NPLUSONE = None
+        assert client.get(reviews_url).status_code == 200
@@ -0,0 +1,118 @@
+import pstats
+import time
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from api.profiling import StackSampler, read_collapsed, top_frames
+
+
+def busy_loop(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+@pytest.fixture
+def profiling_dir(settings, tmp_path):
+    settings.PROFILING_DIR = str(tmp_path)
+    return tmp_path
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23Profiling:
+
+    def test_01_admin_header(self, profiling_dir, admin_client):
+        response = admin_client.get('/api/v1/titles/', HTTP_X_PROFILE='1')
+        assert response.status_code == 200
+        filename = response.get('X-Profile')
+        assert filename and filename.endswith('.prof'), (
+            'Проверьте, что для администратора с заголовком X-Profile '
+            'ответ содержит имя файла профиля.'
+        )
+        assert '-TitleViewSet.list-' in filename
+        stats = pstats.Stats(str(profiling_dir / filename))
+        assert any(
+            function == 'list' for _, _, function in stats.stats
+        ), 'Проверьте, что профиль содержит вызов представления.'
+
+    def test_02_not_admin(self, profiling_dir, user_client, client):
+        for api_client in (user_client, client):
+            response = api_client.get(
+                '/api/v1/titles/', HTTP_X_PROFILE='1'
+            )
+            assert response.status_code == 200
+            assert not response.has_header('X-Profile'), (
+                'Проверьте, что заголовок X-Profile работает только для '
+                'администратора.'
+            )
+        assert not list(profiling_dir.iterdir())
+
+    def test_03_disabled(self, admin_client):
+        response = admin_client.get('/api/v1/titles/', HTTP_X_PROFILE='1')
+        assert not response.has_header('X-Profile'), (
+            'Проверьте, что без PROFILING_DIR запросы не профилируются.'
+        )
+
+    def test_04_sample_rate(self, settings, profiling_dir, client):
+        settings.PROFILING_SAMPLE_RATE = 1
+        settings.PROFILING_MODE = 'sample'
+        response = client.get('/api/v1/genres/')
+        filename = response.get('X-Profile')
+        assert filename and filename.endswith('.collapsed'), (
+            'Проверьте, что при PROFILING_SAMPLE_RATE запросы '
+            'профилируются сэмплером.'
+        )
+        assert (profiling_dir / filename).exists()
+
+    def test_05_report(self, profiling_dir, admin_client):
+        for url in ('/api/v1/titles/', '/api/v1/genres/'):
+            admin_client.get(url, HTTP_X_PROFILE='1')
+        output = StringIO()
+        call_command('profile_report', '--top', '5', stdout=output)
+        assert 'cProfile: 2 profiles' in output.getvalue()
+
+        output = StringIO()
+        call_command(
+            'profile_report', '--view', 'GenreViewSet', stdout=output
+        )
+        assert 'cProfile: 1 profiles' in output.getvalue()
+
+    def test_06_report_errors(self, tmp_path):
+        with pytest.raises(CommandError):
+            call_command('profile_report', '--dir', str(tmp_path))
+        with pytest.raises(CommandError):
+            call_command('profile_report', '--dir', str(tmp_path / 'none'))
+
+
+def test_stack_sampler(tmp_path):
+    sampler = StackSampler(0.001)
+    sampler.enable()
+    busy_loop(0.1)
+    sampler.disable()
+    path = tmp_path / 'test.collapsed'
+    sampler.dump_stats(path)
+
+    stacks = read_collapsed([path, path])
+    assert sum(stacks.values()) == 2 * sum(sampler.stacks.values()) > 0
+    label, own, total = top_frames(stacks, 1, 'tottime')[0]
+    assert label.endswith(':busy_loop'), (
+        'Проверьте, что сэмплер находит функцию, занимающую поток.'
+    )
+    assert own == total
+
+
+def test_report_collapsed(tmp_path):
+    (tmp_path / 'a.collapsed').write_text('main;view;render 3\nmain;view 1\n')
+    (tmp_path / 'b.collapsed').write_text('main;view;query 4\n')
+    merged = tmp_path / 'merged.txt'
+    output = StringIO()
+    call_command(
+        'profile_report', '--dir', str(tmp_path), '--sort', 'tottime',
+        '--collapsed-output', str(merged), stdout=output,
+    )
+    lines = output.getvalue().splitlines()
+    assert lines[0] == 'Sampler: 2 profiles, 8 samples'
+    assert lines[2].split() == ['4', '4', 'query']
+    assert merged.read_text().splitlines()[0] == 'main;view;query 4'